@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import deque
+
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.api.classification import RequestClass, classify_request
+from app.api.responses import FastJSONResponse
+from app.core.config import get_settings
+from app.core.metrics import CollectedMetric, MetricsRegistry, registry
+
+admission_rejected_total = registry.counter(
+    "admission_rejected_total",
+    "Requests shed by admission control, by request class and reason.",
+    ("request_class", "reason"),
+)
+
+
+class ConcurrencyLimiter:
+    """Admit up to ``limit`` concurrent holders, queueing at most ``queue_size``.
+
+    Waiters are served in arrival order; a released slot is handed straight
+    to the next waiter so late arrivals cannot overtake the queue.
+    """
+
+    def __init__(self, limit: int, queue_size: int) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> str | None:
+        """Take a slot; return the rejection reason instead when shedding."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over in the same loop iteration as the
+                # deadline (wait_for on Python 3.12+ still times out); keep it.
+                return None
+            return "timeout"
+        except asyncio.CancelledError:
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled.
+                self.release()
+            raise
+        return None
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, waiter: asyncio.Future[None]) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class AdmissionControlMiddleware:
+    """Shed load per request class before it reaches the database pool.
+
+    Health checks and metrics bypass admission. Searches get their own,
+    smaller budget so a burst of them cannot starve cheap lookups. When a
+    class is at its limit, requests wait in a bounded queue; a full queue
+    or a wait past ``ADMISSION_QUEUE_TIMEOUT_SECONDS`` gets an immediate 503
+    with ``Retry-After`` instead of piling up until clients time out.
+
+    Each instance exports its own queue gauges to ``metrics_registry``.
+    """
+
+    def __init__(self, app: ASGIApp, metrics_registry: MetricsRegistry = registry) -> None:
+        self.app = app
+        settings = get_settings()
+        self.queue_timeout = settings.admission_queue_timeout_seconds
+        self.retry_after = str(max(1, math.ceil(settings.admission_retry_after_seconds)))
+        self.limiters: dict[RequestClass, ConcurrencyLimiter] = {}
+        for request_class, limit, queue_size in (
+            ("standard", settings.admission_standard_concurrency, settings.admission_standard_queue),
+            ("search", settings.admission_search_concurrency, settings.admission_search_queue),
+        ):
+            # A limit of 0 disables admission control for the class.
+            if limit > 0:
+                self.limiters[request_class] = ConcurrencyLimiter(limit, queue_size)
+        for name, documentation, field in (
+            ("admission_active_requests", "Requests holding an admission slot.", "active"),
+            ("admission_queued_requests", "Requests waiting for an admission slot.", "queued"),
+        ):
+            metrics_registry.register(CollectedMetric(name, documentation, "gauge", self._collect(field)))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_class = classify_request(scope)
+        limiter = self.limiters.get(request_class)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await limiter.acquire(self.queue_timeout)
+        if reason is not None:
+            admission_rejected_total.inc(request_class=request_class, reason=reason)
+            response = FastJSONResponse(
+                {"detail": "Сервис перегружен, повторите запрос позже"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": self.retry_after},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    def _collect(self, field: str):
+        def collect():
+            for request_class, limiter in self.limiters.items():
+                yield {"request_class": request_class}, getattr(limiter, field)
+
+        return collect
+
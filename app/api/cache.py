@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.responses import dumps_json
+from app.core.config import get_settings
+from app.services.singleflight import SingleFlight
+from app.services.versions import data_versions, read_versions
+
+CacheKey = tuple[str, tuple[tuple[str, tuple[str, ...]], ...]]
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    etag: str
+    body: bytes
+
+
+class ResponseCache:
+    """Bounded LRU of rendered JSON bodies keyed by route and query."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[CacheKey, CachedBody] = OrderedDict()
+
+    def get(self, key: CacheKey, etag: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.etag != etag:
+            return None
+        self._entries.move_to_end(key)
+        return entry.body
+
+    def set(self, key: CacheKey, etag: str, body: bytes) -> None:
+        self._entries[key] = CachedBody(etag=etag, body=body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > get_settings().response_cache_max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+response_cache = ResponseCache()
+response_flight: SingleFlight[CachedBody] = SingleFlight("responses")
+
+
+async def cached_response(
+    request: Request,
+    session: AsyncSession,
+    datasets: Sequence[str],
+    build: Callable[[], Awaitable[dict]],
+) -> Response:
+    """Serve a GET payload with a strong ETag derived from data versions.
+
+    The version snapshot is process-local, so matching ``If-None-Match``
+    requests and cache hits are answered without a database round trip.
+    Concurrent misses for the same key and ETag share one ``build`` call and
+    its encoded body. A rendered body carries the ETag of the markers read
+    on ``session`` itself, which may be an older replica than the snapshot.
+    """
+    versions = await data_versions.current()
+    key = _cache_key(request)
+    etag = _make_etag(key, [versions.get(name) or "" for name in datasets])
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = response_cache.get(key, etag)
+    if body is None:
+
+        async def render() -> CachedBody:
+            loaded = await read_versions(session)
+            loaded_etag = _make_etag(key, [loaded.get(name) or "" for name in datasets])
+            rendered = dumps_json(await build())
+            response_cache.set(key, loaded_etag, rendered)
+            return CachedBody(etag=loaded_etag, body=rendered)
+
+        rendered = await response_flight.run(
+            (key, etag),
+            render,
+            wait_seconds=get_settings().single_flight_wait_seconds,
+        )
+        body = rendered.body
+        headers["ETag"] = rendered.etag
+
+    # "*" matches any current representation, so it is only honoured once
+    # the body exists; a missing resource has already raised 404 in build().
+    if _etag_matches(if_none_match, headers["ETag"], match_any=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _cache_key(request: Request) -> CacheKey:
+    # Parameters are ordered by name, but repeated values keep their order:
+    # ?ids=2&ids=1 and ?ids=1&ids=2 are different batches.
+    params = request.query_params
+    return request.url.path, tuple((name, tuple(params.getlist(name))) for name in sorted(set(params.keys())))
+
+
+def _make_etag(key: CacheKey, versions: list[str]) -> str:
+    digest = hashlib.blake2b(repr((key, versions)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str, *, match_any: bool = False) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return (match_any and "*" in candidates) or etag in candidates
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from starlette.types import Scope
+
+RequestClass = Literal["health", "standard", "search"]
+
+API_PREFIX = "/api/v1"
+
+# Probes and scrapes must keep working when the API itself is overloaded.
+_HEALTH_PATHS = frozenset({"/metrics", f"{API_PREFIX}/health", f"{API_PREFIX}/health/pool"})
+# Geo and text searches and the export scan far more rows than lookups by id.
+_SEARCH_PATHS = frozenset(
+    {
+        f"{API_PREFIX}/organizations/search",
+        f"{API_PREFIX}/organizations/nearest",
+        f"{API_PREFIX}/organizations/export",
+    }
+)
+
+
+def classify_request(scope: Scope) -> RequestClass:
+    """Cost class of a request, decided from the path before routing."""
+    path = scope["path"].rstrip("/") or "/"
+    if path in _HEALTH_PATHS:
+        return "health"
+    if path in _SEARCH_PATHS:
+        return "search"
+    return "standard"
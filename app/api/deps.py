@@ -5,28 +5,27 @@ from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.db.session import get_session
+from app.db.session import get_read_session
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
 def get_api_key(api_key: str | None = Security(api_key_header)) -> str:
     settings = get_settings()
-    configured_api_key = settings.api_key
-    if not configured_api_key:
+    if not settings.api_key and not settings.api_keys:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="API key not configured",
         )
 
-    if api_key != configured_api_key:
+    if api_key is None or (api_key != settings.api_key and api_key not in settings.api_keys):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid or missing API key",
         )
-    return configured_api_key
+    return api_key
 
 
 async def get_db_session() -> AsyncIterator[AsyncSession]:
-    async for session in get_session():
+    async for session in get_read_session():
         yield session
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+
+from fastapi import APIRouter, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last body chunk.",
+    ("method", "route"),
+)
+http_response_size_bytes = registry.histogram(
+    "http_response_size_bytes",
+    "Response body size.",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled.",
+    ("method",),
+)
+
+router = APIRouter()
+
+
+# Rendered on the event loop: a threadpool endpoint would iterate the label
+# dicts while request handlers are adding to them.
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def route_label(scope: Scope) -> str:
+    """Route template of the matched endpoint, never the raw path.
+
+    Routes of included routers only know their own relative path, so the
+    template is rebuilt by putting the path parameters back into the path.
+    """
+    route = scope.get("route")
+    # Unmatched paths share one label so scanners cannot blow up cardinality.
+    if route is None:
+        return "unmatched"
+    params = {str(value): f"{{{name}}}" for name, value in scope.get("path_params", {}).items()}
+    segments = scope["path"].split("/")
+    template = [params.get(segment, segment) for segment in segments]
+    if sum(segment in params for segment in segments) != len(params):
+        # A converter changed the raw value (e.g. "007" -> 7); fall back to
+        # the route's own template rather than leak the raw path.
+        return route.path
+    return "/".join(template)
+
+
+class MetricsMiddleware:
+    """Record per-route request counts, latency and response sizes."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status_code = 500
+        body_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_progress.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_progress.dec(method=method)
+            route = route_label(scope)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+            http_request_duration_seconds.observe(
+                time.perf_counter() - started,
+                method=method,
+                route=route,
+            )
+            http_response_size_bytes.observe(body_size, method=method, route=route)
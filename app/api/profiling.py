@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.metrics import route_label
+from app.core.config import get_settings
+from app.db.profiling import RequestQueryStats, profile_queries
+
+slow_request_logger = logging.getLogger("app.slow_requests")
+
+
+class QueryProfilingMiddleware:
+    """Report per-request SQL stats when ``REQUEST_PROFILING_ENABLED`` is set.
+
+    Adds a ``Server-Timing`` header with the statement count, total database
+    time and the slowest statement, and logs requests slower than
+    ``SLOW_REQUEST_THRESHOLD_MS`` with the SQL they ran. Streaming responses
+    send headers first, so their header only covers statements run before
+    the first chunk.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        settings = get_settings()
+        if scope["type"] != "http" or not settings.request_profiling_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        with profile_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(stats, time.perf_counter() - started))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if elapsed_ms >= settings.slow_request_threshold_ms:
+                    log_slow_request(scope, status_code, elapsed_ms, stats)
+
+
+def server_timing(stats: RequestQueryStats, elapsed_seconds: float) -> str:
+    metrics = [
+        f'db;dur={stats.total_seconds * 1000:.2f};desc="{stats.count} queries"',
+        f"app;dur={elapsed_seconds * 1000:.2f}",
+    ]
+    if stats.slowest is not None:
+        metrics.append(f"db-slowest;dur={stats.slowest.seconds * 1000:.2f}")
+    return ", ".join(metrics)
+
+
+def log_slow_request(scope: Scope, status_code: int, elapsed_ms: float, stats: RequestQueryStats) -> None:
+    record = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": route_label(scope),
+        "status": status_code,
+        "duration_ms": round(elapsed_ms, 2),
+        "db_queries": stats.count,
+        "db_ms": round(stats.total_seconds * 1000, 2),
+        "statements": [
+            {
+                "sql": timing.statement,
+                "parameters": timing.parameters,
+                "duration_ms": round(timing.seconds * 1000, 3),
+            }
+            for timing in stats.statements
+        ],
+    }
+    if stats.slowest is not None:
+        record["slowest_ms"] = round(stats.slowest.seconds * 1000, 3)
+        record["slowest_sql"] = stats.slowest.statement
+    # One JSON object per line; the dict is also attached for structured handlers.
+    slow_request_logger.warning(
+        json.dumps(record, ensure_ascii=False, default=str),
+        extra={"slow_request": record},
+    )
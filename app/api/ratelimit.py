@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+from fastapi import status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.classification import RequestClass, classify_request
+from app.api.responses import FastJSONResponse
+from app.core.config import Settings, get_settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+rate_limit_rejected_total = registry.counter(
+    "rate_limit_rejected_total",
+    "Requests rejected by the per-key rate limit.",
+    ("api_key", "request_class"),
+)
+
+
+@dataclass(frozen=True)
+class Quota:
+    # Metric label; several keys may share it, so buckets use ``bucket``.
+    name: str
+    bucket: str
+    rate: float
+    burst: float
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    # Tokens left after this request; seconds until ``cost`` tokens are
+    # available again and until the bucket is full.
+    remaining: float
+    retry_after: float
+    reset_after: float
+
+
+class RateLimitBackend(Protocol):
+    async def consume(self, bucket: str, cost: float, quota: Quota) -> RateLimitDecision: ...
+
+
+def _decide(tokens: float, cost: float, quota: Quota, allowed: bool) -> RateLimitDecision:
+    return RateLimitDecision(
+        allowed=allowed,
+        remaining=tokens,
+        retry_after=0.0 if allowed else (cost - tokens) / quota.rate,
+        reset_after=(quota.burst - tokens) / quota.rate,
+    )
+
+
+class MemoryRateLimitBackend:
+    """Token buckets in process memory; exact for a single worker.
+
+    Also the stand-in for the shared backend in tests: both implement the
+    same refill rule.
+    """
+
+    def __init__(self) -> None:
+        # bucket -> (tokens, monotonic time of the last update)
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def consume(self, bucket: str, cost: float, quota: Quota) -> RateLimitDecision:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(bucket, (quota.burst, now))
+        tokens = min(quota.burst, tokens + (now - updated_at) * quota.rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[bucket] = (tokens, now)
+        return _decide(tokens, cost, quota, allowed)
+
+
+# Same refill rule as the memory backend, atomic on the Redis server and
+# timed by its clock so every worker sees one bucket.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets shared by every worker through Redis."""
+
+    def __init__(self, url: str, *, prefix: str = "rate-limit:") -> None:
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package") from exc
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._prefix = prefix
+
+    async def consume(self, bucket: str, cost: float, quota: Quota) -> RateLimitDecision:
+        allowed, tokens = await self._script(
+            keys=[f"{self._prefix}{bucket}"],
+            args=[quota.rate, quota.burst, cost],
+        )
+        return _decide(float(tokens), cost, quota, bool(allowed))
+
+
+def build_backend(settings: Settings) -> RateLimitBackend:
+    if settings.rate_limit_backend == "redis":
+        if not settings.rate_limit_redis_url:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires RATE_LIMIT_REDIS_URL")
+        return RedisRateLimitBackend(settings.rate_limit_redis_url)
+    return MemoryRateLimitBackend()
+
+
+def resolve_quota(settings: Settings, api_key: str) -> Quota | None:
+    """Quota of a configured key, or ``None`` for unknown or unlimited keys."""
+    configured = settings.api_keys.get(api_key)
+    if configured is None and api_key != settings.api_key:
+        return None
+    rate = settings.rate_limit_default_rate
+    burst = settings.rate_limit_default_burst
+    name = None
+    if configured is not None:
+        name = configured.name
+        rate = configured.rate if configured.rate is not None else rate
+        burst = configured.burst if configured.burst is not None else burst
+    if rate <= 0:
+        return None
+    # A bucket smaller than a search would reject every search.
+    burst = max(burst if burst is not None else rate, settings.rate_limit_search_cost, 1.0)
+    digest = hashlib.sha256(api_key.encode()).hexdigest()
+    return Quota(name=name or "key-" + digest[:12], bucket=digest, rate=rate, burst=burst)
+
+
+def request_cost(settings: Settings, request_class: RequestClass) -> float:
+    return settings.rate_limit_search_cost if request_class == "search" else 1.0
+
+
+class RateLimitMiddleware:
+    """Per-API-key token buckets with ``X-RateLimit-*`` headers.
+
+    Requests without a valid key pass through untouched; ``get_api_key``
+    rejects them. Over-quota requests get 429 with ``Retry-After``. If the
+    shared store is unreachable requests are let through rather than failed.
+    """
+
+    def __init__(self, app: ASGIApp, backend: RateLimitBackend | None = None) -> None:
+        self.app = app
+        self.backend = backend
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_class = classify_request(scope)
+        api_key = Headers(scope=scope).get("x-api-key")
+        settings = get_settings()
+        quota = resolve_quota(settings, api_key) if api_key and request_class != "health" else None
+        if quota is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.backend is None:
+            self.backend = build_backend(settings)
+        try:
+            decision = await self.backend.consume(quota.bucket, request_cost(settings, request_class), quota)
+        except Exception:
+            logger.warning("Rate limit store unavailable; request admitted", exc_info=True)
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            "X-RateLimit-Limit": str(math.floor(quota.burst)),
+            "X-RateLimit-Remaining": str(math.floor(decision.remaining)),
+            "X-RateLimit-Reset": str(math.ceil(decision.reset_after)),
+        }
+        if not decision.allowed:
+            rate_limit_rejected_total.inc(api_key=quota.name, request_class=request_class)
+            response = FastJSONResponse(
+                {"detail": "Превышен лимит запросов для API-ключа"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={**headers, "Retry-After": str(max(1, math.ceil(decision.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
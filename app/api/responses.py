@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    orjson = None
+
+
+def dumps_json(content: Any) -> bytes:
+    """Encode plain JSON types; orjson when available, else the stdlib."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class; content must already be plain JSON types.
+
+    Endpoints return it directly with dicts built by the serializers, which
+    skips FastAPI's ``jsonable_encoder`` pass over the payload.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.cache import cached_response
 from app.api.deps import get_api_key, get_db_session
-from app.services.activities import fetch_activity_tree
+from app.services.activities import (
+    fetch_activity_ancestors,
+    fetch_activity_subtree,
+    fetch_activity_tree,
+)
+from app.services.versions import ACTIVITIES
 
 router = APIRouter()
 
@@ -14,9 +20,47 @@ router = APIRouter()
     summary="Получить дерево видов деятельности",
 )
 async def get_activity_tree(
+    request: Request,
     max_level: int | None = Query(default=None, ge=1),
     _: str = Depends(get_api_key),
     session: AsyncSession = Depends(get_db_session),
-) -> dict:
-    tree = await fetch_activity_tree(session, max_level=max_level)
-    return {"max_level": max_level, "items": tree}
+) -> Response:
+    async def build() -> dict:
+        tree = await fetch_activity_tree(session, max_level=max_level)
+        return {"max_level": max_level, "items": tree}
+
+    return await cached_response(request, session, (ACTIVITIES,), build)
+
+
+@router.get(
+    "/{activity_id}/subtree",
+    summary="Получить ветку дерева видов деятельности",
+)
+async def get_activity_subtree(
+    request: Request,
+    activity_id: int,
+    max_depth: int | None = Query(default=None, ge=0),
+    _: str = Depends(get_api_key),
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    async def build() -> dict:
+        subtree = await fetch_activity_subtree(session, activity_id, max_depth=max_depth)
+        return {"max_depth": max_depth, "item": subtree}
+
+    return await cached_response(request, session, (ACTIVITIES,), build)
+
+
+@router.get(
+    "/{activity_id}/ancestors",
+    summary="Получить путь от корня дерева до вида деятельности",
+)
+async def get_activity_ancestors(
+    request: Request,
+    activity_id: int,
+    _: str = Depends(get_api_key),
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    async def build() -> dict:
+        return {"items": await fetch_activity_ancestors(session, activity_id)}
+
+    return await cached_response(request, session, (ACTIVITIES,), build)
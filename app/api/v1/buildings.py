@@ -1,21 +1,39 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.cache import cached_response
 from app.api.deps import get_api_key, get_db_session
-from app.services.buildings import list_buildings, serialize_building
+from app.services.buildings import count_buildings, list_buildings, serialize_building
+from app.services.counts import TotalMode
+from app.services.pagination import ensure_single_pagination_mode
+from app.services.versions import BUILDINGS
 
 router = APIRouter()
 
 
 @router.get("", summary="Список зданий справочника")
 async def get_buildings(
+    request: Request,
     _: str = Depends(get_api_key),
     session: AsyncSession = Depends(get_db_session),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
-) -> dict:
-    buildings = await list_buildings(session, limit=limit, offset=offset)
-    items = [serialize_building(building) for building in buildings]
-    return {"total": len(items), "items": items, "limit": limit, "offset": offset}
+    cursor: str | None = Query(default=None, min_length=1),
+    total: TotalMode = Query(default="exact"),
+) -> Response:
+    ensure_single_pagination_mode(cursor, offset)
+
+    async def build() -> dict:
+        page = await list_buildings(session, limit=limit, offset=offset, cursor=cursor)
+        items = [serialize_building(building) for building in page.items]
+        return {
+            "total": await count_buildings(session, mode=total),
+            "items": items,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": page.next_cursor,
+        }
+
+    return await cached_response(request, session, (BUILDINGS,), build)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.cache import cached_response
+from app.api.deps import get_api_key, get_db_session
+from app.services.changes import list_changes
+from app.services.versions import ALL_DATASETS
+
+router = APIRouter()
+
+
+@router.get("", summary="Журнал изменений справочника для инкрементальной синхронизации")
+async def get_changes(
+    request: Request,
+    since: str | None = Query(default=None, min_length=1),
+    limit: int = Query(default=500, ge=1, le=5000),
+    _: str = Depends(get_api_key),
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    async def build() -> dict:
+        page = await list_changes(session, since, limit=limit)
+        return {"items": page.items, "next": page.next_token, "has_more": page.has_more}
+
+    return await cached_response(request, session, ALL_DATASETS, build)
@@ -1,40 +1,101 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.cache import cached_response
 from app.api.deps import get_api_key, get_db_session
+from app.api.responses import FastJSONResponse, dumps_json
+from app.core.config import get_settings
+from app.schemas.organizations import OrganizationBatchRequest
+from app.services.counts import TotalMode
 from app.services.organizations import (
+    SearchFilters,
+    count_organizations_for_building,
+    count_search_organizations,
+    find_nearest_organizations,
+    get_organizations_batch,
     list_organizations_for_building,
     search_organizations,
     serialize_organization,
     get_organization_detail,
+    stream_organizations,
 )
+from app.services.pagination import ensure_single_pagination_mode
+from app.services.versions import ACTIVITIES, ALL_DATASETS, ORGANIZATIONS
 
 router = APIRouter()
 
 
+def get_search_filters(
+    lat: float | None = Query(default=None),
+    lon: float | None = Query(default=None),
+    radius_km: float | None = Query(default=None, gt=0),
+    min_lat: float | None = Query(default=None),
+    max_lat: float | None = Query(default=None),
+    min_lon: float | None = Query(default=None),
+    max_lon: float | None = Query(default=None),
+    query: str | None = Query(default=None, min_length=1),
+    activity_id: int | None = Query(default=None, gt=0),
+) -> SearchFilters:
+    _validate_geo_filters(lat, lon, radius_km, min_lat, max_lat, min_lon, max_lon)
+    return SearchFilters(
+        lat=lat,
+        lon=lon,
+        radius_km=radius_km,
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lon=min_lon,
+        max_lon=max_lon,
+        query=query,
+        activity_id=activity_id,
+    )
+
+
 @router.get(
     "",
     summary="Список организаций арендаторов здания",
 )
 async def list_organizations(
+    request: Request,
     building_id: int = Query(..., gt=0),
     activity_id: int | None = Query(default=None, gt=0),
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, min_length=1),
+    total: TotalMode = Query(default="exact"),
     _: str = Depends(get_api_key),
     session: AsyncSession = Depends(get_db_session),
-) -> dict:
-    organizations = await list_organizations_for_building(
-        session,
-        building_id,
-        activity_id,
-        limit=limit,
-        offset=offset,
-    )
-    items = [serialize_organization(org) for org in organizations]
-    return {"total": len(items), "items": items, "limit": limit, "offset": offset}
+) -> Response:
+    ensure_single_pagination_mode(cursor, offset)
+
+    async def build() -> dict:
+        page = await list_organizations_for_building(
+            session,
+            building_id,
+            activity_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        items = [serialize_organization(org) for org in page.items]
+        return {
+            "total": await count_organizations_for_building(
+                session,
+                building_id,
+                activity_id,
+                mode=total,
+            ),
+            "items": items,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": page.next_cursor,
+        }
+
+    return await cached_response(request, session, (ORGANIZATIONS, ACTIVITIES), build)
 
 
 @router.get(
@@ -42,37 +103,112 @@ async def list_organizations(
     summary="Геопоиск, глобальный поиск по активности или названию",
 )
 async def search_organizations_endpoint(
-    lat: float | None = Query(default=None),
-    lon: float | None = Query(default=None),
-    radius_km: float | None = Query(default=None, gt=0),
-    min_lat: float | None = Query(default=None),
-    max_lat: float | None = Query(default=None),
-    min_lon: float | None = Query(default=None),
-    max_lon: float | None = Query(default=None),
-    query: str | None = Query(default=None, min_length=1),
-    activity_id: int | None = Query(default=None, gt=0),
+    request: Request,
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, min_length=1),
+    total: TotalMode = Query(default="exact"),
     _: str = Depends(get_api_key),
+    filters: SearchFilters = Depends(get_search_filters),
     session: AsyncSession = Depends(get_db_session),
-) -> dict:
-    _validate_geo_filters(lat, lon, radius_km, min_lat, max_lat, min_lon, max_lon)
-    organizations = await search_organizations(
+) -> Response:
+    ensure_single_pagination_mode(cursor, offset)
+
+    async def build() -> dict:
+        page = await search_organizations(
+            session,
+            filters,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        items = [serialize_organization(org) for org in page.items]
+        return {
+            "total": await count_search_organizations(session, filters, mode=total),
+            "items": items,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": page.next_cursor,
+        }
+
+    return await cached_response(request, session, ALL_DATASETS, build)
+
+
+@router.get(
+    "/export",
+    summary="Потоковая выгрузка организаций в NDJSON",
+)
+async def export_organizations_endpoint(
+    _: str = Depends(get_api_key),
+    filters: SearchFilters = Depends(get_search_filters),
+    session: AsyncSession = Depends(get_db_session),
+) -> StreamingResponse:
+    batches = await stream_organizations(
         session,
-        lat=lat,
-        lon=lon,
-        radius_km=radius_km,
-        min_lat=min_lat,
-        max_lat=max_lat,
-        min_lon=min_lon,
-        max_lon=max_lon,
-        query=query,
-        activity_id=activity_id,
-        limit=limit,
-        offset=offset,
+        filters,
+        batch_size=get_settings().export_batch_size,
     )
-    items = [serialize_organization(org) for org in organizations]
-    return {"total": len(items), "items": items, "limit": limit, "offset": offset}
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for batch in batches:
+            yield b"".join(dumps_json(serialize_organization(org)) + b"\n" for org in batch)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/nearest",
+    summary="Ближайшие к точке организации",
+)
+async def nearest_organizations_endpoint(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(default=10, ge=1, le=100),
+    _: str = Depends(get_api_key),
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    async def build() -> dict:
+        nearest = await find_nearest_organizations(session, lat=lat, lon=lon, k=k)
+        items = [
+            serialize_organization(org) | {"distance_km": round(distance_km, 3)}
+            for org, distance_km in nearest
+        ]
+        return {"total": len(items), "items": items, "k": k}
+
+    return await cached_response(request, session, ALL_DATASETS, build)
+
+
+@router.get(
+    "/batch",
+    summary="Карточки нескольких организаций за один запрос",
+)
+async def get_organizations_batch_endpoint(
+    request: Request,
+    ids: list[str] = Query(..., description="Идентификаторы через запятую или повтором"),
+    _: str = Depends(get_api_key),
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    organization_ids = _normalize_batch_ids(
+        [part for value in ids for part in value.split(",") if part.strip()]
+    )
+
+    async def build() -> dict:
+        return await _load_batch(session, organization_ids)
+
+    return await cached_response(request, session, ALL_DATASETS, build)
+
+
+@router.post(
+    "/batch",
+    summary="Карточки нескольких организаций за один запрос",
+)
+async def post_organizations_batch_endpoint(
+    payload: OrganizationBatchRequest,
+    _: str = Depends(get_api_key),
+    session: AsyncSession = Depends(get_db_session),
+) -> FastJSONResponse:
+    return FastJSONResponse(await _load_batch(session, _normalize_batch_ids(payload.ids)))
 
 
 @router.get(
@@ -80,12 +216,50 @@ async def search_organizations_endpoint(
     summary="Карточка организации",
 )
 async def get_organization(
+    request: Request,
     organization_id: int,
     _: str = Depends(get_api_key),
     session: AsyncSession = Depends(get_db_session),
-) -> dict:
-    organization = await get_organization_detail(session, organization_id)
-    return serialize_organization(organization)
+) -> Response:
+    async def build() -> dict:
+        organization = await get_organization_detail(session, organization_id)
+        return serialize_organization(organization)
+
+    return await cached_response(request, session, ALL_DATASETS, build)
+
+
+async def _load_batch(session: AsyncSession, organization_ids: list[int]) -> dict:
+    organizations = await get_organizations_batch(session, organization_ids)
+    found_ids = {org.id for org in organizations}
+    return {
+        "items": [serialize_organization(org) for org in organizations],
+        "missing": [org_id for org_id in organization_ids if org_id not in found_ids],
+    }
+
+
+def _normalize_batch_ids(raw_ids: list[str] | list[int]) -> list[int]:
+    try:
+        parsed = [int(raw_id) for raw_id in raw_ids]
+    except ValueError:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Идентификаторы организаций должны быть целыми числами.",
+        ) from None
+
+    organization_ids = list(dict.fromkeys(parsed))
+    if not organization_ids or any(org_id <= 0 for org_id in organization_ids):
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Нужно передать положительные идентификаторы организаций.",
+        )
+
+    max_ids = get_settings().batch_max_ids
+    if len(organization_ids) > max_ids:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"За один запрос можно получить не более {max_ids} организаций.",
+        )
+    return organization_ids
 
 
 def _validate_geo_filters(
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends
 
 from app.api.deps import get_api_key
-from app.api.v1 import organizations, activities, buildings
+from app.api.v1 import organizations, activities, buildings, changes
+from app.db import session as db_session
+from app.db.pool import pool_status
 
 router = APIRouter()
 router.include_router(
@@ -19,8 +21,22 @@ router.include_router(
     prefix="/buildings",
     tags=["buildings"],
 )
+router.include_router(
+    changes.router,
+    prefix="/changes",
+    tags=["changes"],
+)
 
 
 @router.get("/health", tags=["health"], summary="Проверить доступность API")
 def healthcheck(_: str = Depends(get_api_key)) -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get(
+    "/health/pool",
+    tags=["health"],
+    summary="Состояние пула соединений с базой данных",
+)
+async def pool_health(_: str = Depends(get_api_key)) -> dict:
+    return pool_status(db_session.engine.pool)
@@ -1,7 +1,17 @@
 from functools import lru_cache
+from typing import Annotated, Literal
 
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import BaseModel, Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+
+class ApiKeyQuota(BaseModel):
+    """Token-bucket quota of one API key; unset fields use the defaults."""
+
+    # Label for metrics and the shared store, so the key itself is never logged.
+    name: str | None = None
+    rate: float | None = None
+    burst: float | None = None
 
 
 class Settings(BaseSettings):
@@ -15,10 +25,63 @@ class Settings(BaseSettings):
     api_version: str = "0.1.0"
     debug: bool = False
     api_key: str | None = Field(default=None, alias="API_KEY")
+    # JSON object of additional keys: {"<key>": {"name": ..., "rate": ..., "burst": ...}}.
+    api_keys: dict[str, ApiKeyQuota] = Field(default_factory=dict, alias="API_KEYS")
+    # Requests per second refilled into each key's bucket; 0 disables limiting.
+    rate_limit_default_rate: float = 0.0
+    rate_limit_default_burst: float | None = None
+    # Tokens taken by geo and text searches; other requests take one.
+    rate_limit_search_cost: float = 5.0
+    rate_limit_backend: Literal["memory", "redis"] = "memory"
+    rate_limit_redis_url: str | None = None
     database_url: str = Field(
         default="sqlite+aiosqlite:///./app.db",
         alias="DATABASE_URL",
     )
+    # Comma-separated read replica URLs; reads fall back to DATABASE_URL.
+    database_replica_urls: Annotated[list[str], NoDecode] = Field(
+        default_factory=list,
+        alias="DATABASE_REPLICA_URLS",
+    )
+    replica_failure_cooldown_seconds: float = 30.0
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # Set both caches to 0 behind PgBouncer in transaction pooling mode.
+    db_statement_cache_size: int = 100
+    db_prepared_statement_cache_size: int = 100
+    data_version_poll_seconds: float = 1.0
+    spatial_index_cell_deg: float = 0.05
+    # Geo searches matching more buildings filter by coordinates in SQL
+    # instead of listing the ids from the spatial index inline.
+    spatial_inline_ids_max: int = 1000
+    count_cache_ttl_seconds: float = 30.0
+    count_cache_max_entries: int = 1024
+    response_cache_max_entries: int = 512
+    # How long concurrent identical reads wait for the in-flight one.
+    single_flight_wait_seconds: float = 5.0
+    batch_max_ids: int = 300
+    export_batch_size: int = 500
+    # Admission control: concurrent requests and queue length per request
+    # class (see app.api.classification); a concurrency of 0 disables it.
+    admission_standard_concurrency: int = 64
+    admission_standard_queue: int = 256
+    admission_search_concurrency: int = 16
+    admission_search_queue: int = 32
+    admission_queue_timeout_seconds: float = 2.0
+    admission_retry_after_seconds: float = 1.0
+    # Per-request SQL stats in Server-Timing headers and the slow-request log.
+    request_profiling_enabled: bool = False
+    slow_request_threshold_ms: float = 500.0
+
+    @field_validator("database_replica_urls", mode="before")
+    @classmethod
+    def _split_replica_urls(cls, value: object) -> object:
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
 
 
 @lru_cache(maxsize=1)
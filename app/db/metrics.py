@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import CollectedMetric, registry
+from app.db import session as db_session
+from app.db.pool import pool_status
+from app.db.profiling import record_statement
+
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+db_queries_total = registry.counter(
+    "db_queries_total",
+    "SQL statements executed, by leading keyword.",
+    ("operation",),
+)
+db_query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL statements, by leading keyword.",
+    ("operation",),
+    buckets=QUERY_BUCKETS,
+)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement executed through ``engine``; idempotent.
+
+    Also feeds the per-request stats of :mod:`app.db.profiling`.
+    """
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, parameters, _context, _executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    operation = statement_operation(statement)
+    db_queries_total.inc(operation=operation)
+    db_query_duration_seconds.observe(elapsed, operation=operation)
+    record_statement(statement, parameters, elapsed)
+
+
+def statement_operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    # Bounded label values: anything unusual is reported as "OTHER".
+    if keyword in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA"}:
+        return keyword
+    return "OTHER"
+
+
+def _engines() -> Iterable[tuple[str, AsyncEngine]]:
+    yield "primary", db_session.engine
+    for index, replica in enumerate(db_session.replicas.engines):
+        yield f"replica-{index}", replica
+
+
+def _pool_field(field: str):
+    def collect() -> Iterable[tuple[dict[str, str], float]]:
+        for name, engine in _engines():
+            value = pool_status(engine.pool).get(field)
+            if value is not None:
+                yield {"engine": name}, value
+
+    return collect
+
+
+for _name, _field, _kind, _documentation in (
+    ("db_pool_size", "size", "gauge", "Configured pool size."),
+    ("db_pool_capacity", "capacity", "gauge", "Pool size plus max overflow."),
+    ("db_pool_checked_out", "checked_out", "gauge", "Connections currently checked out."),
+    ("db_pool_overflow", "overflow", "gauge", "Current overflow connections."),
+    ("db_pool_saturation", "saturation", "gauge", "Checked-out connections as a share of capacity."),
+    ("db_pool_checkouts_total", "checkouts", "counter", "Connection checkouts."),
+    (
+        "db_pool_saturated_checkouts_total",
+        "saturated_checkouts",
+        "counter",
+        "Checkouts that found every connection in use.",
+    ),
+    ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that timed out."),
+    (
+        "db_pool_checkout_wait_seconds_total",
+        "wait_seconds_total",
+        "counter",
+        "Time spent waiting for connection checkouts.",
+    ),
+):
+    registry.register(CollectedMetric(_name, _documentation, _kind, _pool_field(_field)))
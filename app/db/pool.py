@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+@dataclass
+class PoolCheckoutStats:
+    checkouts: int = 0
+    # Checkouts that found every connection, overflow included, in use.
+    saturated_checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = PoolCheckoutStats()
+
+    def _do_get(self):
+        stats = self.checkout_stats
+        capacity = self.capacity
+        if capacity is not None and self.checkedout() >= capacity:
+            stats.saturated_checkouts += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            stats.checkouts += 1
+            stats.wait_seconds_total += waited
+            stats.wait_seconds_max = max(stats.wait_seconds_max, waited)
+
+    @property
+    def capacity(self) -> int | None:
+        if self._max_overflow < 0:
+            return None
+        return self.size() + self._max_overflow
+
+
+def pool_status(pool: Pool) -> dict:
+    """Current occupancy and cumulative checkout statistics of ``pool``."""
+    if not isinstance(pool, InstrumentedAsyncPool):
+        return {"pool": type(pool).__name__}
+    capacity = pool.capacity
+    checked_out = pool.checkedout()
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "capacity": capacity,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 4) if capacity else None,
+        **asdict(pool.checkout_stats),
+    }
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+# Statements kept per request for the slow-request log; counts and timings
+# cover every statement regardless.
+MAX_RECORDED_STATEMENTS = 50
+
+
+@dataclass
+class StatementTiming:
+    statement: str
+    parameters: Any
+    seconds: float
+
+
+@dataclass
+class RequestQueryStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest: StatementTiming | None = None
+    statements: list[StatementTiming] = field(default_factory=list)
+
+    def record(self, statement: str, parameters: Any, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        timing = StatementTiming(statement, parameters, seconds)
+        if self.slowest is None or seconds > self.slowest.seconds:
+            self.slowest = timing
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append(timing)
+
+
+_current_stats: ContextVar[RequestQueryStats | None] = ContextVar("request_query_stats", default=None)
+
+
+@contextmanager
+def profile_queries() -> Iterator[RequestQueryStats]:
+    """Collect statements executed in the current context into fresh stats."""
+    stats = RequestQueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_statement(statement: str, parameters: Any, seconds: float) -> None:
+    """Called from the engine cursor listeners; no-op outside ``profile_queries``."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, parameters, seconds)
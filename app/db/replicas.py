@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import time
+from collections.abc import Iterator, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Round-robin choice among read replicas that are currently healthy.
+
+    A replica is taken out of rotation for ``cooldown_seconds`` when it
+    fails to connect or drops a connection, then tried again.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine], *, cooldown_seconds: float) -> None:
+        self.engines = list(engines)
+        self._cooldown_seconds = cooldown_seconds
+        self._unhealthy_until: dict[int, float] = {}
+        self._rotation = itertools.count()
+        for engine in self.engines:
+            event.listen(engine.sync_engine, "handle_error", self._error_listener(engine))
+
+    def candidates(self) -> Iterator[AsyncEngine]:
+        """Yield healthy replicas, starting at the next one in rotation."""
+        if not self.engines:
+            return
+        start = next(self._rotation) % len(self.engines)
+        now = time.monotonic()
+        for offset in range(len(self.engines)):
+            engine = self.engines[(start + offset) % len(self.engines)]
+            if self._unhealthy_until.get(id(engine), 0.0) <= now:
+                yield engine
+
+    def mark_unhealthy(self, engine: AsyncEngine) -> None:
+        if self._unhealthy_until.get(id(engine), 0.0) <= time.monotonic():
+            logger.warning(
+                "Read replica %s is unavailable; skipping it for %.0f s",
+                engine.url.render_as_string(hide_password=True),
+                self._cooldown_seconds,
+            )
+        self._unhealthy_until[id(engine)] = time.monotonic() + self._cooldown_seconds
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return self._unhealthy_until.get(id(engine), 0.0) <= time.monotonic()
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+    def _error_listener(self, engine: AsyncEngine):
+        def on_error(context: ExceptionContext) -> None:
+            # No connection means the error happened while connecting.
+            if context.is_disconnect or context.connection is None:
+                self.mark_unhealthy(engine)
+
+        return on_error
@@ -1,28 +1,106 @@
+import asyncio
 from collections.abc import AsyncIterator
 
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.db.pool import InstrumentedAsyncPool
+from app.db.replicas import ReplicaSet
 
 
 class Base(DeclarativeBase):
     pass
-def _make_engine() -> AsyncEngine:
+def _make_engine(database_url: str | None = None) -> AsyncEngine:
     settings = get_settings()
-    return create_async_engine(settings.database_url, echo=settings.debug)
+    database_url = database_url or settings.database_url
+    return create_async_engine(
+        database_url,
+        echo=settings.debug,
+        **_engine_options(settings, database_url),
+    )
 
 
+def _make_replicas() -> ReplicaSet:
+    settings = get_settings()
+    return ReplicaSet(
+        [_make_engine(url) for url in settings.database_replica_urls],
+        cooldown_seconds=settings.replica_failure_cooldown_seconds,
+    )
+
+
+def _engine_options(settings: Settings, database_url: str) -> dict:
+    url = make_url(database_url)
+    # In-memory SQLite runs on a single shared connection; pool sizing
+    # does not apply to it.
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    options: dict = {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            # asyncpg's own per-connection cache of prepared statements.
+            "statement_cache_size": settings.db_statement_cache_size,
+            # SQLAlchemy's cache of asyncpg prepared statement objects.
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        }
+    return options
+
+
+# The primary engine takes every write; read-only requests go through
+# get_read_session, which prefers replicas when they are configured.
 engine = _make_engine()
 AsyncSessionFactory = async_sessionmaker(engine, expire_on_commit=False)
+replicas = _make_replicas()
+ReadSessionFactory = async_sessionmaker(expire_on_commit=False)
 
 
 def reset_engine() -> None:
-    global engine, AsyncSessionFactory
+    global engine, AsyncSessionFactory, replicas
     engine = _make_engine()
     AsyncSessionFactory = async_sessionmaker(engine, expire_on_commit=False)
+    replicas = _make_replicas()
+
+
+def get_dialect_name(session: AsyncSession) -> str:
+    return session.get_bind().dialect.name
 
 
 async def get_session() -> AsyncIterator[AsyncSession]:
     async with AsyncSessionFactory() as session:
         yield session
+
+
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """Yield a session on a healthy replica, or on the primary if none is."""
+    session = await _connect_replica()
+    if session is None:
+        session = AsyncSessionFactory()
+    async with session:
+        yield session
+
+
+async def _connect_replica() -> AsyncSession | None:
+    # Connecting up front lets a dead replica fail over before the request
+    # runs any query, instead of failing the request. Drivers such as asyncpg
+    # raise socket errors and connect timeouts as is, not as DBAPI errors,
+    # and those never reach the engine's handle_error hook.
+    for replica in replicas.candidates():
+        session = ReadSessionFactory(bind=replica)
+        try:
+            await session.connection()
+        except (DBAPIError, OSError, asyncio.TimeoutError):
+            await session.close()
+            replicas.mark_unhealthy(replica)
+            continue
+        return session
+    return None
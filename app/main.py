@@ -1,13 +1,41 @@
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.api import metrics
+from app.api.admission import AdmissionControlMiddleware
+from app.api.profiling import QueryProfilingMiddleware
+from app.api.ratelimit import RateLimitMiddleware
+from app.api.responses import FastJSONResponse
 from app.api.router import api_router
 from app.core.config import get_settings
+from app.db import session as db_session
+from app.db.metrics import instrument_engine
+from app.services.activities import get_activity_hierarchy
+from app.services.spatial import get_building_index
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_caches() -> None:
+    # Caches reload lazily on first use, so a database that is not migrated
+    # yet must not prevent the app from starting.
+    try:
+        async with db_session.AsyncSessionFactory() as session:
+            await get_building_index(session)
+            await get_activity_hierarchy(session)
+    except SQLAlchemyError:
+        logger.warning("Cache warm-up skipped: database is not ready", exc_info=True)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    instrument_engine(db_session.engine)
+    for replica in db_session.replicas.engines:
+        instrument_engine(replica)
+    await warm_up_caches()
     yield
 
 
@@ -35,5 +63,13 @@ app = FastAPI(
     redoc_url="/redoc",
     openapi_tags=tags_metadata,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
+# Outermost last: rate limiting runs before a request takes an admission
+# slot, and rejected requests still show up in metrics and profiles.
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(QueryProfilingMiddleware)
 app.include_router(api_router)
+app.include_router(metrics.router)
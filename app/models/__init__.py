@@ -1,8 +1,9 @@
-from app.models.entities import Activity, Building, Organization, OrganizationPhone
+from app.models.entities import Activity, Building, DataVersion, Organization, OrganizationPhone
 
 __all__ = [
     "Activity",
     "Building",
+    "DataVersion",
     "Organization",
     "OrganizationPhone",
 ]
@@ -1,11 +1,39 @@
 from __future__ import annotations
 
-from sqlalchemy import CheckConstraint, Column, Float, ForeignKey, Integer, String, Table
+import math
+from datetime import datetime
+
+from sqlalchemy import (
+    DDL,
+    CheckConstraint,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    event,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
 
 
+class RevisionMixin:
+    """Change tracking for the change feed; see ``app.services.changes``."""
+
+    # Value of ``change_log_state.revision`` when the row was last written.
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
 organization_activity_table = Table(
     "organization_activities",
     Base.metadata,
@@ -21,8 +49,27 @@ organization_activity_table = Table(
     ),
 )
 
+# Every (ancestor, descendant) pair of the activity tree, including the
+# zero-depth self pair, so branch filters are a single indexed join.
+activity_closure_table = Table(
+    "activity_closure",
+    Base.metadata,
+    Column(
+        "ancestor_id",
+        ForeignKey("activities.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "descendant_id",
+        ForeignKey("activities.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("depth", Integer, nullable=False),
+    Index("ix_activity_closure_descendant_id", "descendant_id"),
+)
+
 
-class Building(Base):
+class Building(RevisionMixin, Base):
     __tablename__ = "buildings"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -30,14 +77,39 @@ class Building(Base):
     address: Mapped[str] = mapped_column(String(255), nullable=False)
     latitude: Mapped[float] = mapped_column(Float, nullable=False, index=True)
     longitude: Mapped[float] = mapped_column(Float, nullable=False, index=True)
+    # Precomputed for great-circle distance ordering in SQL without
+    # depending on trigonometric functions in the database.
+    lat_sin: Mapped[float] = mapped_column(Float, nullable=False)
+    lat_cos: Mapped[float] = mapped_column(Float, nullable=False)
+    lon_sin: Mapped[float] = mapped_column(Float, nullable=False)
+    lon_cos: Mapped[float] = mapped_column(Float, nullable=False)
 
     organizations: Mapped[list["Organization"]] = relationship(
         back_populates="building",
         cascade="all, delete-orphan",
     )
+    __table_args__ = (Index("ix_buildings_revision", "revision", "id"),)
+
+
+def location_trig_values(latitude: float, longitude: float) -> dict[str, float]:
+    lat_rad = math.radians(latitude)
+    lon_rad = math.radians(longitude)
+    return {
+        "lat_sin": math.sin(lat_rad),
+        "lat_cos": math.cos(lat_rad),
+        "lon_sin": math.sin(lon_rad),
+        "lon_cos": math.cos(lon_rad),
+    }
+
 
+@event.listens_for(Building, "before_insert")
+@event.listens_for(Building, "before_update")
+def _fill_location_trig(_mapper, _connection, building: Building) -> None:
+    for key, value in location_trig_values(building.latitude, building.longitude).items():
+        setattr(building, key, value)
 
-class Organization(Base):
+
+class Organization(RevisionMixin, Base):
     __tablename__ = "organizations"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -58,6 +130,57 @@ class Organization(Base):
         secondary=organization_activity_table,
         back_populates="organizations",
     )
+    __table_args__ = (Index("ix_organizations_revision", "revision", "id"),)
+
+
+# Name search indexes that cannot be declared on the table itself: a
+# trigram FTS5 table kept in sync by triggers on SQLite and a pg_trgm GIN
+# index on PostgreSQL. Alembic migrations create the same objects.
+ORGANIZATION_NAME_SEARCH_DDL: dict[str, tuple[str, ...]] = {
+    "sqlite": (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS organizations_fts USING fts5(
+            name, content='organizations', content_rowid='id', tokenize='trigram'
+        )
+        """,
+        """
+        CREATE TRIGGER organizations_fts_ai AFTER INSERT ON organizations BEGIN
+            INSERT INTO organizations_fts (rowid, name) VALUES (new.id, new.name);
+        END
+        """,
+        """
+        CREATE TRIGGER organizations_fts_ad AFTER DELETE ON organizations BEGIN
+            INSERT INTO organizations_fts (organizations_fts, rowid, name)
+            VALUES ('delete', old.id, old.name);
+        END
+        """,
+        """
+        CREATE TRIGGER organizations_fts_au AFTER UPDATE OF name ON organizations BEGIN
+            INSERT INTO organizations_fts (organizations_fts, rowid, name)
+            VALUES ('delete', old.id, old.name);
+            INSERT INTO organizations_fts (rowid, name) VALUES (new.id, new.name);
+        END
+        """,
+    ),
+    "postgresql": (
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_organizations_name_trgm "
+        "ON organizations USING gin (name gin_trgm_ops)",
+    ),
+}
+
+for _dialect, _statements in ORGANIZATION_NAME_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            Organization.__table__,
+            "after_create",
+            DDL(_statement).execute_if(dialect=_dialect),
+        )
+event.listen(
+    Organization.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS organizations_fts").execute_if(dialect="sqlite"),
+)
 
 
 class OrganizationPhone(Base):
@@ -67,13 +190,14 @@ class OrganizationPhone(Base):
     organization_id: Mapped[int] = mapped_column(
         ForeignKey("organizations.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     phone: Mapped[str] = mapped_column(String(32), nullable=False)
 
     organization: Mapped[Organization] = relationship(back_populates="phones")
 
 
-class Activity(Base):
+class Activity(RevisionMixin, Base):
     __tablename__ = "activities"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -103,4 +227,37 @@ class Activity(Base):
             "(parent_id IS NULL AND level = 1) OR (parent_id IS NOT NULL AND level > 1)",
             name="ck_activities_level_parent",
         ),
+        Index("ix_activities_revision", "revision", "id"),
     )
+
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[str] = mapped_column(String(32), nullable=False)
+
+
+class ChangeLogState(Base):
+    """Single row holding the last assigned change revision.
+
+    ``reset_revision`` is the revision of the last bulk reload that replaced
+    the directory without tombstones; older change tokens are invalid.
+    """
+
+    __tablename__ = "change_log_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    reset_revision: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    entity: Mapped[str] = mapped_column(String(32), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    __table_args__ = (Index("ix_tombstones_revision", "revision", "id"),)
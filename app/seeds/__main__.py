@@ -1,14 +1,89 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
+import os
+from pathlib import Path
 
 from app.db.session import AsyncSessionFactory
+from app.seeds.generator import (
+    GeneratorConfig,
+    build_activity_tree,
+    iter_organizations,
+    write_ndjson,
+)
+from app.seeds.loader import DEFAULT_BATCH_SIZE, load_directory, load_records
 from app.seeds.reference import seed_reference_data
 
 
-async def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.seeds",
+        description="Без аргументов загружает справочный набор данных.",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    load = commands.add_parser("load", help="Массовая загрузка справочника из NDJSON.")
+    load.add_argument("--file", type=Path, required=True, help="Файл в формате /organizations/export.")
+    load.add_argument(
+        "--truncate",
+        action="store_true",
+        help="Удалить текущие здания, организации и виды деятельности перед загрузкой.",
+    )
+    load.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    generate = commands.add_parser(
+        "generate",
+        help="Синтетический справочник для нагрузочного тестирования.",
+    )
+    generate.add_argument("--organizations", type=int, required=True)
+    generate.add_argument("--buildings", type=int, required=True)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    target = generate.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", type=Path, help="Записать NDJSON в файл.")
+    target.add_argument(
+        "--database",
+        action="store_true",
+        help="Заменить справочник в базе данных сгенерированным.",
+    )
+    generate.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    return parser
+
+
+async def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.command == "generate" and args.output is not None:
+        config = GeneratorConfig(args.organizations, args.buildings, args.seed)
+        with args.output.open("w", encoding="utf-8") as output:
+            count = write_ndjson(config, output, workers=args.workers)
+        print(f"Wrote {count} organizations to {args.output}.")
+        return
+
     async with AsyncSessionFactory() as session:
-        await seed_reference_data(session)
+        if args.command == "load":
+            stats = await load_directory(
+                session,
+                args.file,
+                truncate=args.truncate,
+                batch_size=args.batch_size,
+            )
+        elif args.command == "generate":
+            config = GeneratorConfig(args.organizations, args.buildings, args.seed)
+            stats = await load_records(
+                session,
+                build_activity_tree(),
+                iter_organizations(config, workers=args.workers),
+                truncate=True,
+                batch_size=args.batch_size,
+            )
+        else:
+            await seed_reference_data(session)
+            return
+    print(
+        f"Loaded {stats.organizations} organizations, {stats.buildings} buildings, "
+        f"{stats.activities} activities, {stats.phones} phones."
+    )
 
 
 if __name__ == "__main__":
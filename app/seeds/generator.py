@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import json
+import random
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TextIO, TypeVar
+
+CHUNK_SIZE = 10_000
+
+T = TypeVar("T")
+
+# (город, широта центра, долгота центра, телефонный код, население в тыс.)
+CITIES: tuple[tuple[str, float, float, str, int], ...] = (
+    ("Москва", 55.7558, 37.6173, "495", 13100),
+    ("Санкт-Петербург", 59.9386, 30.3141, "812", 5600),
+    ("Новосибирск", 55.0084, 82.9357, "383", 1630),
+    ("Екатеринбург", 56.8389, 60.6057, "343", 1540),
+    ("Казань", 55.7961, 49.1064, "843", 1310),
+    ("Нижний Новгород", 56.3269, 44.0059, "831", 1210),
+    ("Челябинск", 55.1644, 61.4368, "351", 1180),
+    ("Самара", 53.1959, 50.1002, "846", 1160),
+    ("Ростов-на-Дону", 47.2357, 39.7015, "863", 1140),
+    ("Краснодар", 45.0355, 38.9753, "861", 1100),
+)
+
+STREETS = (
+    "Ленина",
+    "Мира",
+    "Советская",
+    "Гагарина",
+    "Садовая",
+    "Пушкина",
+    "Центральная",
+    "Молодёжная",
+    "Школьная",
+    "Лесная",
+    "Набережная",
+    "Заводская",
+)
+STREET_KINDS = ("улица", "проспект", "переулок", "бульвар", "шоссе")
+
+# Доли организационно-правовых форм примерно как в ЕГРЮЛ.
+LEGAL_FORMS = (("ООО", 70), ("ИП", 15), ("АО", 8), ("ЗАО", 5), ("ПАО", 2))
+NAME_ADJECTIVES = (
+    "Северный",
+    "Южный",
+    "Золотой",
+    "Новый",
+    "Первый",
+    "Главный",
+    "Городской",
+    "Народный",
+    "Быстрый",
+    "Надёжный",
+    "Столичный",
+    "Сибирский",
+)
+NAME_NOUNS = (
+    "Ветер",
+    "Мир",
+    "Дом",
+    "Берег",
+    "Союз",
+    "Стандарт",
+    "Маркет",
+    "Сервис",
+    "Транзит",
+    "Альянс",
+    "Квартал",
+    "Ресурс",
+)
+
+ACTIVITY_TREE: dict[str, dict[str, tuple[str, ...]]] = {
+    "Продукты питания": {
+        "Мясная продукция": ("Колбасы", "Полуфабрикаты"),
+        "Молочная продукция": ("Сыры", "Кисломолочные продукты"),
+        "Хлеб и выпечка": ("Кондитерские изделия", "Пекарни"),
+    },
+    "Автомобили": {
+        "Грузовые": ("Запчасти", "Сервисное обслуживание"),
+        "Легковые": ("Запчасти", "Аксессуары", "Шиномонтаж"),
+    },
+    "Логистика": {
+        "Складская логистика": ("Холодильные склады", "Ответственное хранение"),
+        "Грузоперевозки": ("Междугородние", "Городская доставка"),
+    },
+    "Строительство": {
+        "Стройматериалы": ("Кирпич и блоки", "Отделочные материалы"),
+        "Ремонт": ("Квартиры", "Коммерческие помещения"),
+    },
+    "Услуги": {
+        "Бытовые услуги": ("Химчистка", "Ремонт обуви"),
+        "Образование": ("Языковые курсы", "Детские секции"),
+        "Медицина": ("Стоматология", "Лаборатории"),
+    },
+}
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    organizations: int
+    buildings: int
+    seed: int = 0
+
+
+def build_activity_tree() -> list[dict]:
+    """Return the fixed three-level activity tree, parents before children."""
+    rows: list[dict] = []
+
+    def add(name: str, parent_id: int | None, level: int) -> int:
+        rows.append({"id": len(rows) + 1, "name": name, "parent_id": parent_id, "level": level})
+        return len(rows)
+
+    for root_name, groups in ACTIVITY_TREE.items():
+        root_id = add(root_name, None, 1)
+        for group_name, leaves in groups.items():
+            group_id = add(group_name, root_id, 2)
+            for leaf_name in leaves:
+                add(leaf_name, group_id, 3)
+    return rows
+
+
+def iter_organizations(
+    config: GeneratorConfig,
+    *,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[dict]:
+    """Yield export-shaped organizations with ids ``1..config.organizations``.
+
+    Output depends only on ``config``: every chunk and every building is
+    derived from its own seeded generator, so the worker count only changes
+    how fast the same records are produced.
+    """
+    for chunk in _iter_chunks(_generate_chunk, config, workers, chunk_size):
+        yield from chunk
+
+
+def write_ndjson(
+    config: GeneratorConfig,
+    output: TextIO,
+    *,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """Write activity declarations and organizations in the loader format."""
+    for activity in build_activity_tree():
+        output.write(json.dumps({"type": "activity", **activity}, ensure_ascii=False) + "\n")
+    # Workers serialize their own chunks; encoding in the parent process
+    # would otherwise be the bottleneck.
+    for lines in _iter_chunks(_generate_chunk_lines, config, workers, chunk_size):
+        output.write(lines)
+    return config.organizations
+
+
+def _iter_chunks(
+    generate: Callable[[GeneratorConfig, int, int], T],
+    config: GeneratorConfig,
+    workers: int,
+    chunk_size: int,
+) -> Iterator[T]:
+    ranges = [
+        (start, min(start + chunk_size, config.organizations + 1))
+        for start in range(1, config.organizations + 1, chunk_size)
+    ]
+    if workers <= 1:
+        for start, stop in ranges:
+            yield generate(config, start, stop)
+        return
+
+    # A bounded number of chunks in flight keeps memory flat when the
+    # consumer (usually the database) is slower than the generators.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque[Future[T]] = deque()
+        for start, stop in ranges:
+            pending.append(executor.submit(generate, config, start, stop))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _generate_chunk_lines(config: GeneratorConfig, start: int, stop: int) -> str:
+    return "".join(
+        json.dumps(record, ensure_ascii=False) + "\n"
+        for record in _generate_chunk(config, start, stop)
+    )
+
+
+def _generate_chunk(config: GeneratorConfig, start: int, stop: int) -> list[dict]:
+    rng = random.Random(f"{config.seed}:organizations:{start}")
+    activities = build_activity_tree()
+    by_id = {row["id"]: row for row in activities}
+    leaves = [row for row in activities if row["level"] == 3]
+    groups = [row for row in activities if row["level"] == 2]
+    forms, form_weights = zip(*LEGAL_FORMS)
+
+    records = []
+    for organization_id in range(start, stop):
+        # Skewed towards low ids, so some buildings are busy business centres.
+        building_id = 1 + int(config.buildings * rng.random() ** 2)
+        building = _building(config.seed, building_id)
+        # Zipf-like stems: a few names are very common, most are rare.
+        adjective = NAME_ADJECTIVES[_zipf_index(rng, len(NAME_ADJECTIVES))]
+        noun = NAME_NOUNS[_zipf_index(rng, len(NAME_NOUNS))]
+        form = rng.choices(forms, weights=form_weights)[0]
+        # The id suffix keeps names unique across independently generated chunks.
+        name = f"{form} «{adjective} {noun}» №{organization_id}"
+
+        phone_count = rng.choices((1, 2, 3), weights=(60, 30, 10))[0]
+        phones = sorted(
+            {
+                f"+7-{building['phone_code']}-{rng.randrange(100, 1000)}-{rng.randrange(10000):04d}"
+                for _ in range(phone_count)
+            }
+        )
+
+        linked = {rng.choice(leaves)["id"]}
+        if rng.random() < 0.3:
+            linked.add(rng.choice(groups)["id"])
+        if rng.random() < 0.1:
+            linked.add(rng.choice(leaves)["id"])
+        activity_rows = sorted((by_id[i] for i in linked), key=lambda a: (a["level"], a["name"]))
+
+        records.append(
+            {
+                "id": organization_id,
+                "name": name,
+                "phones": phones,
+                "building": {
+                    "id": building_id,
+                    "city": building["city"],
+                    "address": building["address"],
+                    "location": {"lat": building["lat"], "lon": building["lon"]},
+                },
+                "activities": [dict(row) for row in activity_rows],
+            }
+        )
+    return records
+
+
+@lru_cache(maxsize=65536)
+def _building(seed: int, building_id: int) -> dict:
+    rng = random.Random(f"{seed}:buildings:{building_id}")
+    city, lat, lon, phone_code, _ = rng.choices(
+        CITIES,
+        weights=[population for *_, population in CITIES],
+    )[0]
+    street = f"{rng.choice(STREETS)} {rng.choice(STREET_KINDS)}"
+    return {
+        "city": city,
+        "address": f"{street}, {rng.randint(1, 250)}",
+        # Roughly a 10 km spread around the centre, denser towards it.
+        "lat": round(rng.gauss(lat, 0.06), 6),
+        "lon": round(rng.gauss(lon, 0.1), 6),
+        "phone_code": phone_code,
+    }
+
+
+def _zipf_index(rng: random.Random, size: int) -> int:
+    return min(int(rng.paretovariate(1.2)) - 1, size - 1)
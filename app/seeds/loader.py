@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import Table, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_dialect_name
+from app.models.entities import (
+    Activity,
+    Building,
+    Organization,
+    OrganizationPhone,
+    location_trig_values,
+    organization_activity_table,
+)
+from app.services.activities import rebuild_activity_closure
+from app.services.changes import allocate_revision
+from app.services.versions import ALL_DATASETS, bump_data_versions
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Child tables first, so plain DELETE never trips a foreign key.
+_DIRECTORY_TABLES = (
+    "activity_closure",
+    "organization_activities",
+    "organization_phones",
+    "organizations",
+    "activities",
+    "buildings",
+    "tombstones",
+)
+
+
+@dataclass
+class LoadStats:
+    buildings: int = 0
+    activities: int = 0
+    organizations: int = 0
+    phones: int = 0
+
+
+async def load_directory(
+    session: AsyncSession,
+    path: Path,
+    *,
+    truncate: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> LoadStats:
+    """Bulk-load an NDJSON directory dump in a single transaction.
+
+    Each line is an organization in the ``/organizations/export`` format.
+    Lines of the form ``{"type": "activity", ...}`` declare activities that
+    no organization links to directly, such as upper levels of the tree.
+
+    The activity tree is small, so a first pass collects it and the second
+    pass streams organizations into :func:`load_records`.
+    """
+    activities = _collect_activities(path)
+    organizations = (
+        record
+        for record in _read_records(path)
+        if record.get("type", "organization") == "organization"
+    )
+    return await load_records(
+        session,
+        activities.values(),
+        organizations,
+        truncate=truncate,
+        batch_size=batch_size,
+    )
+
+
+async def load_records(
+    session: AsyncSession,
+    activities: Iterable[dict],
+    organizations: Iterable[dict],
+    *,
+    truncate: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> LoadStats:
+    """Write an activity tree and export-shaped organizations in batches.
+
+    Activities are inserted parents first, then organizations are written
+    together with their buildings, phones and activity links. Every row
+    gets one change revision; a truncating load also invalidates older
+    change feed tokens, since it leaves no tombstones behind.
+
+    The revision is taken before any row is written, so on PostgreSQL the
+    ``change_log_state`` row stays locked for the whole load and every other
+    writer waits until it commits. Run large loads when the directory is
+    not being edited.
+    """
+    dialect_name = get_dialect_name(session)
+    stats = LoadStats()
+    connection = await session.connection()
+    revision = await connection.run_sync(
+        lambda sync_connection: allocate_revision(sync_connection, reset=truncate)
+    )
+    change = {"revision": revision, "updated_at": datetime.now(timezone.utc)}
+
+    if truncate:
+        await _truncate(session, dialect_name)
+        known_buildings: set[int] = set()
+        known_activities: set[int] = set()
+    else:
+        known_buildings = set(await session.scalars(select(Building.id)))
+        known_activities = set(await session.scalars(select(Activity.id)))
+
+    activities = {row["id"]: row for row in activities}
+    missing = sorted(
+        {row["parent_id"] for row in activities.values() if row["parent_id"] is not None}
+        - activities.keys()
+        - known_activities
+    )
+    if missing:
+        raise ValueError(f"Activities reference undeclared parents: {missing}")
+    activity_rows = [
+        {**row, **change}
+        for row in _order_parents_first(activities)
+        if row["id"] not in known_activities
+    ]
+    for chunk in _chunks(activity_rows, batch_size):
+        await _write_rows(session, dialect_name, Activity.__table__, chunk)
+    stats.activities = len(activity_rows)
+
+    batch = _Batch(change)
+    for record in organizations:
+        batch.add(record, known_buildings)
+        if len(batch.organizations) >= batch_size:
+            await batch.flush(session, dialect_name, stats)
+            batch = _Batch(change)
+    await batch.flush(session, dialect_name, stats)
+
+    await rebuild_activity_closure(session)
+    if dialect_name == "postgresql":
+        await _sync_sequences(session)
+    await bump_data_versions(session, *ALL_DATASETS)
+    await session.commit()
+    return stats
+
+
+class _Batch:
+    def __init__(self, change: dict) -> None:
+        self.change = change
+        self.buildings: list[dict] = []
+        self.organizations: list[dict] = []
+        self.phones: list[dict] = []
+        self.links: list[dict] = []
+
+    def add(self, record: dict, known_buildings: set[int]) -> None:
+        building = record["building"]
+        if building["id"] not in known_buildings:
+            known_buildings.add(building["id"])
+            latitude = building["location"]["lat"]
+            longitude = building["location"]["lon"]
+            self.buildings.append(
+                {
+                    "id": building["id"],
+                    "city": building["city"],
+                    "address": building["address"],
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    **location_trig_values(latitude, longitude),
+                    **self.change,
+                }
+            )
+        self.organizations.append(
+            {"id": record["id"], "name": record["name"], "building_id": building["id"], **self.change}
+        )
+        self.phones.extend(
+            {"organization_id": record["id"], "phone": phone} for phone in record["phones"]
+        )
+        self.links.extend(
+            {"organization_id": record["id"], "activity_id": activity["id"]}
+            for activity in record["activities"]
+        )
+
+    async def flush(self, session: AsyncSession, dialect_name: str, stats: LoadStats) -> None:
+        await _write_rows(session, dialect_name, Building.__table__, self.buildings)
+        await _write_rows(session, dialect_name, Organization.__table__, self.organizations)
+        await _write_rows(session, dialect_name, OrganizationPhone.__table__, self.phones)
+        await _write_rows(session, dialect_name, organization_activity_table, self.links)
+        stats.buildings += len(self.buildings)
+        stats.organizations += len(self.organizations)
+        stats.phones += len(self.phones)
+
+
+async def _write_rows(
+    session: AsyncSession,
+    dialect_name: str,
+    table: Table,
+    rows: list[dict],
+) -> None:
+    if not rows:
+        return
+    if dialect_name == "postgresql":
+        await _copy_rows(session, table, rows)
+    else:
+        # A list of parameter sets makes this a single executemany call.
+        await session.execute(insert(table), rows)
+
+
+async def _copy_rows(session: AsyncSession, table: Table, rows: list[dict]) -> None:
+    columns = list(rows[0])
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    # COPY runs on the same asyncpg connection, inside the session transaction.
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name,
+        records=[tuple(row[column] for column in columns) for row in rows],
+        columns=columns,
+    )
+
+
+async def _truncate(session: AsyncSession, dialect_name: str) -> None:
+    if dialect_name == "postgresql":
+        await session.execute(text(f"TRUNCATE {', '.join(_DIRECTORY_TABLES)}"))
+        return
+    for table in _DIRECTORY_TABLES:
+        await session.execute(text(f"DELETE FROM {table}"))
+
+
+async def _sync_sequences(session: AsyncSession) -> None:
+    # COPY with explicit ids leaves identity sequences behind the data.
+    for table in ("buildings", "activities", "organizations", "organization_phones"):
+        await session.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            )
+        )
+    await session.execute(text(f"ANALYZE {', '.join(_DIRECTORY_TABLES)}"))
+
+
+def _collect_activities(path: Path) -> dict[int, dict]:
+    activities: dict[int, dict] = {}
+    for record in _read_records(path):
+        if record.get("type") == "activity":
+            declared = [record]
+        else:
+            declared = record["activities"]
+        for activity in declared:
+            activities.setdefault(
+                activity["id"],
+                {
+                    "id": activity["id"],
+                    "name": activity["name"],
+                    "parent_id": activity["parent_id"],
+                    "level": activity["level"],
+                },
+            )
+    return activities
+
+
+def _order_parents_first(activities: dict[int, dict]) -> list[dict]:
+    return sorted(activities.values(), key=lambda row: (row["level"], row["id"]))
+
+
+def _read_records(path: Path) -> Iterator[dict]:
+    with path.open(encoding="utf-8") as source:
+        for line_number, line in enumerate(source, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {exc.msg}") from exc
+
+
+def _chunks(rows: Sequence[dict], size: int) -> Iterator[list[dict]]:
+    for start in range(0, len(rows), size):
+        yield list(rows[start : start + size])
@@ -5,6 +5,10 @@ from dataclasses import dataclass
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.entities import location_trig_values
+from app.services.activities import rebuild_activity_closure
+from app.services.versions import ALL_DATASETS, bump_data_versions
+
 
 @dataclass
 class SeedDataset:
@@ -25,6 +29,7 @@ class SeedDataset:
 async def seed_reference_data(session: AsyncSession, *, truncate: bool = True) -> SeedDataset:
     if truncate:
         for table in (
+            "activity_closure",
             "organization_activities",
             "organization_phones",
             "organizations",
@@ -60,11 +65,17 @@ async def seed_reference_data(session: AsyncSession, *, truncate: bool = True) -
         await session.execute(
             text(
                 """
-                INSERT INTO buildings (id, city, address, latitude, longitude)
-                VALUES (:id, :city, :address, :latitude, :longitude)
+                INSERT INTO buildings (
+                    id, city, address, latitude, longitude,
+                    lat_sin, lat_cos, lon_sin, lon_cos
+                )
+                VALUES (
+                    :id, :city, :address, :latitude, :longitude,
+                    :lat_sin, :lat_cos, :lon_sin, :lon_cos
+                )
                 """
             ),
-            row,
+            row | location_trig_values(row["latitude"], row["longitude"]),
         )
 
     activities = [
@@ -86,6 +97,7 @@ async def seed_reference_data(session: AsyncSession, *, truncate: bool = True) -
             ),
             row,
         )
+    await rebuild_activity_closure(session)
 
     organizations = [
         {"id": 1000, "name": "ООО Рога и Копыта", "building_id": 100},
@@ -139,6 +151,7 @@ async def seed_reference_data(session: AsyncSession, *, truncate: bool = True) -
             row,
         )
 
+    await bump_data_versions(session, *ALL_DATASETS)
     await session.commit()
     return SeedDataset(
         primary_building_id=100,
@@ -1,9 +1,117 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Iterable
+from itertools import chain
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, event, insert, literal, select
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.entities import Activity, activity_closure_table
+from app.services.singleflight import SingleFlight
+from app.services.versions import ACTIVITIES, data_versions, read_versions
+
+
+class ActivityHierarchy:
+    """Immutable in-memory snapshot of the activity tree.
+
+    The snapshot is shared by every request, so trees and paths are built
+    from it as fresh dicts on each call; callers may modify what they get.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[tuple[int, str, int, int | None]],
+        *,
+        version: str | None,
+    ) -> None:
+        self.version = version
+        self._nodes: dict[int, dict] = {}
+        self._children: dict[int | None, list[int]] = {}
+        for activity_id, name, level, parent_id in rows:
+            self._nodes[activity_id] = {
+                "id": activity_id,
+                "name": name,
+                "level": level,
+                "parent_id": parent_id,
+            }
+            self._children.setdefault(parent_id, []).append(activity_id)
+        for child_ids in self._children.values():
+            child_ids.sort(key=lambda child_id: self._nodes[child_id]["name"])
+
+        self.depth = max((node["level"] for node in self._nodes.values()), default=0)
+
+    def __contains__(self, activity_id: int) -> bool:
+        return activity_id in self._nodes
+
+    def tree(self, max_level: int | None = None) -> list[dict]:
+        depth = self.depth if max_level is None else min(max_level, self.depth)
+        return self._build_children(None, depth)
+
+    def subtree(self, activity_id: int, max_depth: int | None = None) -> dict:
+        """Return the activity with its descendants down to ``max_depth`` levels below it."""
+        node = self._nodes[activity_id]
+        max_level = self.depth if max_depth is None else min(node["level"] + max_depth, self.depth)
+        return node | {"children": self._build_children(activity_id, max_level)}
+
+    def ancestors(self, activity_id: int) -> list[dict]:
+        """Return the activities above ``activity_id``, root first."""
+        path = []
+        parent_id = self._nodes[activity_id]["parent_id"]
+        while parent_id is not None:
+            node = self._nodes[parent_id]
+            path.append(dict(node))
+            parent_id = node["parent_id"]
+        path.reverse()
+        return path
+
+    def _build_children(self, parent_id: int | None, max_level: int) -> list[dict]:
+        children = []
+        for child_id in self._children.get(parent_id, []):
+            node = self._nodes[child_id]
+            if node["level"] > max_level:
+                continue
+            children.append(node | {"children": self._build_children(child_id, max_level)})
+        return children
+
+
+_activity_hierarchy: ActivityHierarchy | None = None
+_hierarchy_flight: SingleFlight[ActivityHierarchy] = SingleFlight("activity_hierarchy")
+
+
+async def get_activity_hierarchy(session: AsyncSession) -> ActivityHierarchy:
+    """Return the process-local hierarchy, reloading it when activities changed."""
+    global _activity_hierarchy
+
+    version = await data_versions.version_of(ACTIVITIES)
+    hierarchy = _activity_hierarchy
+    if hierarchy is not None and hierarchy.version == version:
+        return hierarchy
+
+    # Tag the snapshot with the marker of the node that loads it, which may
+    # be a replica still behind the monitor.
+    version = (await read_versions(session)).get(ACTIVITIES)
+    if hierarchy is not None and hierarchy.version == version:
+        return hierarchy
 
-from app.models.entities import Activity
+    # After a deploy or an activities change every request would reload it.
+    hierarchy = await _hierarchy_flight.run(
+        version,
+        lambda: _load_activity_hierarchy(session, version),
+        wait_seconds=get_settings().single_flight_wait_seconds,
+    )
+    _activity_hierarchy = hierarchy
+    return hierarchy
+
+
+async def _load_activity_hierarchy(session: AsyncSession, version: str | None) -> ActivityHierarchy:
+    rows = await session.execute(
+        select(Activity.id, Activity.name, Activity.level, Activity.parent_id)
+    )
+    return ActivityHierarchy(rows.all(), version=version)
 
 
 async def fetch_activity_tree(
@@ -11,35 +119,64 @@ async def fetch_activity_tree(
     *,
     max_level: int | None = None,
 ) -> list[dict]:
-    stmt = select(Activity).order_by(Activity.level.asc(), Activity.name.asc())
-    if max_level is not None:
-        stmt = stmt.where(Activity.level <= max_level)
-
-    rows = (await session.scalars(stmt)).all()
-    by_id: dict[int, dict] = {}
-    roots: list[dict] = []
-
-    for activity in rows:
-        node = {
-            "id": activity.id,
-            "name": activity.name,
-            "level": activity.level,
-            "parent_id": activity.parent_id,
-            "children": [],
-        }
-        by_id[activity.id] = node
-
-    for activity in rows:
-        node = by_id[activity.id]
-        if activity.parent_id is None:
-            roots.append(node)
-            continue
-        parent = by_id.get(activity.parent_id)
-        if parent is not None:
-            parent["children"].append(node)
-
-    for node in by_id.values():
-        node["children"].sort(key=lambda child: child["name"])
-
-    roots.sort(key=lambda item: item["name"])
-    return roots
+    hierarchy = await get_activity_hierarchy(session)
+    return hierarchy.tree(max_level)
+
+
+async def fetch_activity_subtree(
+    session: AsyncSession,
+    activity_id: int,
+    *,
+    max_depth: int | None = None,
+) -> dict:
+    hierarchy = await _get_hierarchy_with(session, activity_id)
+    return hierarchy.subtree(activity_id, max_depth)
+
+
+async def fetch_activity_ancestors(session: AsyncSession, activity_id: int) -> list[dict]:
+    hierarchy = await _get_hierarchy_with(session, activity_id)
+    return hierarchy.ancestors(activity_id)
+
+
+async def _get_hierarchy_with(session: AsyncSession, activity_id: int) -> ActivityHierarchy:
+    hierarchy = await get_activity_hierarchy(session)
+    if activity_id not in hierarchy:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Activity not found")
+    return hierarchy
+
+
+async def rebuild_activity_closure(session: AsyncSession) -> None:
+    """Recompute ``activity_closure``; used by writers that bypass the ORM."""
+    await session.run_sync(lambda sync_session: _rebuild_closure(sync_session.connection()))
+
+
+def _rebuild_closure(connection: Connection) -> None:
+    branch = select(
+        Activity.id.label("ancestor_id"),
+        Activity.id.label("descendant_id"),
+        literal(0).label("depth"),
+    ).cte("branch", recursive=True)
+    branch = branch.union_all(
+        select(
+            branch.c.ancestor_id,
+            Activity.id,
+            branch.c.depth + 1,
+        ).join(Activity, Activity.parent_id == branch.c.descendant_id)
+    )
+
+    connection.execute(delete(activity_closure_table))
+    connection.execute(
+        insert(activity_closure_table).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(branch.c.ancestor_id, branch.c.descendant_id, branch.c.depth),
+        )
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _rebuild_closure_after_flush(session: Session, _flush_context) -> None:
+    # The tree is small and rarely edited, so a full rebuild in the same
+    # transaction is simpler than patching the affected branches.
+    changed = chain(session.new, session.dirty, session.deleted)
+    if any(isinstance(instance, Activity) for instance in changed):
+        _rebuild_closure(session.connection())
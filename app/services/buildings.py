@@ -1,23 +1,61 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.entities import Building
+from app.services.counts import TotalMode, count_rows
+from app.services.pagination import Page, build_page, decode_cursor, keyset_after
+from app.services.versions import BUILDINGS
 
+# Listings read plain rows; building ORM objects per row costs more than
+# the query itself on large pages.
+_BUILDING_COLUMNS = (
+    Building.id,
+    Building.city,
+    Building.address,
+    Building.latitude,
+    Building.longitude,
+)
 
-async def list_buildings(session: AsyncSession, *, limit: int, offset: int) -> list[Building]:
+
+async def list_buildings(
+    session: AsyncSession,
+    *,
+    limit: int,
+    offset: int,
+    cursor: str | None = None,
+) -> Page[Row]:
     stmt = (
-        select(Building)
-        .order_by(Building.city.asc(), Building.address.asc())
+        select(*_BUILDING_COLUMNS)
+        .order_by(Building.city.asc(), Building.address.asc(), Building.id.asc())
         .offset(offset)
-        .limit(limit)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        after = decode_cursor(cursor, str, str, int)
+        stmt = stmt.where(keyset_after([Building.city, Building.address, Building.id], after))
+
+    result = await session.execute(stmt)
+    return build_page(
+        result.all(),
+        limit,
+        lambda building: [building.city, building.address, building.id],
+    )
+
+
+async def count_buildings(session: AsyncSession, *, mode: TotalMode = "exact") -> int:
+    return await count_rows(
+        session,
+        select(Building),
+        key=("buildings",),
+        datasets=(BUILDINGS,),
+        mode=mode,
+        table_name=Building.__tablename__,
     )
-    result = await session.scalars(stmt)
-    return list(result)
 
 
-def serialize_building(building: Building) -> dict:
+def serialize_building(building: Building | Row) -> dict:
     return {
         "id": building.id,
         "city": building.city,
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import chain
+
+from fastapi import HTTPException, status
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Connection, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.entities import (
+    Activity,
+    Building,
+    ChangeLogState,
+    Organization,
+    OrganizationPhone,
+    Tombstone,
+    organization_activity_table,
+)
+from app.services.buildings import serialize_building
+from app.services.organizations import get_organizations_batch, serialize_organization
+from app.services.pagination import decode_cursor, encode_cursor, keyset_after
+
+ACTIVITY = "activity"
+BUILDING = "building"
+ORGANIZATION = "organization"
+
+_ENTITY_BY_MODEL: dict[type, str] = {
+    Activity: ACTIVITY,
+    Building: BUILDING,
+    Organization: ORGANIZATION,
+}
+_MODEL_BY_ENTITY = {entity: model for model, entity in _ENTITY_BY_MODEL.items()}
+
+# Order of entries sharing a revision: parents before the rows that
+# reference them, deletions last.
+_RANK = {ACTIVITY: 0, BUILDING: 1, ORGANIZATION: 2}
+_TOMBSTONE_RANK = 3
+
+_state = ChangeLogState.__table__
+_tombstones = Tombstone.__table__
+
+
+@dataclass
+class ChangePage:
+    items: list[dict]
+    next_token: str | None
+    has_more: bool
+
+
+def allocate_revision(connection: Connection, *, reset: bool = False) -> int:
+    """Take the next revision in the current transaction.
+
+    The counter row stays locked until commit on PostgreSQL, so writers
+    commit in revision order and a reader never sees revision N + 1 before N.
+    With ``reset`` the revision also invalidates every older change token.
+    """
+    values = {"revision": _state.c.revision + 1}
+    if reset:
+        values["reset_revision"] = _state.c.revision + 1
+    revision = connection.execute(
+        update(_state).where(_state.c.id == 1).values(values).returning(_state.c.revision)
+    ).scalar_one_or_none()
+    if revision is None:
+        revision = 1
+        connection.execute(
+            insert(_state).values(id=1, revision=revision, reset_revision=revision if reset else 0)
+        )
+    return revision
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changes_after_flush(session: Session, _flush_context) -> None:
+    changed: dict[str, dict[int, object]] = {entity: {} for entity in _MODEL_BY_ENTITY}
+    deleted: set[tuple[str, int]] = set()
+    for instance in chain(session.new, session.dirty):
+        entity = _ENTITY_BY_MODEL.get(type(instance))
+        if entity is not None:
+            changed[entity][instance.id] = instance
+        elif isinstance(instance, OrganizationPhone):
+            changed[ORGANIZATION].setdefault(instance.organization_id, None)
+    for instance in session.deleted:
+        entity = _ENTITY_BY_MODEL.get(type(instance))
+        if entity is not None:
+            deleted.add((entity, instance.id))
+        elif isinstance(instance, OrganizationPhone):
+            changed[ORGANIZATION].setdefault(instance.organization_id, None)
+    for entity, entity_id in deleted:
+        changed[entity].pop(entity_id, None)
+
+    connection = session.connection()
+    for organization_id in _organizations_embedding(connection, session.dirty):
+        changed[ORGANIZATION].setdefault(organization_id, None)
+    if not deleted and not any(changed.values()):
+        return
+
+    revision = allocate_revision(connection)
+    now = datetime.now(timezone.utc)
+    for entity, instances in changed.items():
+        if not instances:
+            continue
+        table = _MODEL_BY_ENTITY[entity].__table__
+        connection.execute(
+            update(table)
+            .where(table.c.id.in_(instances))
+            .values(revision=revision, updated_at=now)
+        )
+        for instance in instances.values():
+            if instance is not None:
+                set_committed_value(instance, "revision", revision)
+                set_committed_value(instance, "updated_at", now)
+    if deleted:
+        connection.execute(
+            insert(_tombstones),
+            [
+                {"revision": revision, "entity": entity, "entity_id": entity_id, "deleted_at": now}
+                for entity, entity_id in sorted(deleted)
+            ],
+        )
+
+
+def _organizations_embedding(connection: Connection, updated: Iterable[object]) -> set[int]:
+    """Organizations whose card embeds one of the updated buildings or activities.
+
+    Cards carry the building's address and location and the fields of
+    directly linked activities, so those organizations are re-emitted too.
+    Ancestors are not embedded: renaming a parent leaves its descendants'
+    cards unchanged.
+    """
+    building_ids = [instance.id for instance in updated if isinstance(instance, Building)]
+    activity_ids = [instance.id for instance in updated if isinstance(instance, Activity)]
+    organization_ids: set[int] = set()
+    if building_ids:
+        organization_ids.update(
+            connection.scalars(select(Organization.id).where(Organization.building_id.in_(building_ids)))
+        )
+    if activity_ids:
+        organization_ids.update(
+            connection.scalars(
+                select(organization_activity_table.c.organization_id).where(
+                    organization_activity_table.c.activity_id.in_(activity_ids)
+                )
+            )
+        )
+    return organization_ids
+
+
+async def list_changes(session: AsyncSession, since: str | None, *, limit: int) -> ChangePage:
+    """Upserts and deletions after ``since`` in revision order.
+
+    Upserts carry the current state of the row, so a row changed several
+    times appears once, at its latest revision. Organization links to a
+    deleted activity are removed by the database without a new revision
+    of the organization; mirrors should drop them with the activity.
+    """
+    position = (-1, 0, 0)
+    if since is not None:
+        position = tuple(decode_cursor(since, int, int, int))
+        reset_revision = await session.scalar(
+            select(ChangeLogState.reset_revision).where(ChangeLogState.id == 1)
+        )
+        if reset_revision is not None and position[0] < reset_revision:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Справочник был перезагружен целиком, требуется полная синхронизация",
+            )
+
+    entries: list[tuple[tuple[int, int, int], dict]] = []
+    for entity in (ACTIVITY, BUILDING, ORGANIZATION):
+        model = _MODEL_BY_ENTITY[entity]
+        rows = await _fetch_after(session, _upsert_columns(model), model, _RANK[entity], position, limit)
+        entries.extend(((row.revision, _RANK[entity], row.id), _upsert(entity, row)) for row in rows)
+    tombstone_rows = await _fetch_after(
+        session,
+        (Tombstone.revision, Tombstone.id, Tombstone.entity, Tombstone.entity_id, Tombstone.deleted_at),
+        Tombstone,
+        _TOMBSTONE_RANK,
+        position,
+        limit,
+    )
+    entries.extend(((row.revision, _TOMBSTONE_RANK, row.id), _deletion(row)) for row in tombstone_rows)
+
+    entries.sort(key=lambda entry: entry[0])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    await _attach_organization_cards(session, [item for _, item in entries])
+    next_token = encode_cursor(entries[-1][0]) if entries else since
+    return ChangePage(items=[item for _, item in entries], next_token=next_token, has_more=has_more)
+
+
+def _upsert_columns(model: type) -> tuple:
+    if model is Activity:
+        return (
+            Activity.revision,
+            Activity.id,
+            Activity.updated_at,
+            Activity.name,
+            Activity.parent_id,
+            Activity.level,
+        )
+    if model is Building:
+        return (
+            Building.revision,
+            Building.id,
+            Building.updated_at,
+            Building.city,
+            Building.address,
+            Building.latitude,
+            Building.longitude,
+        )
+    return (Organization.revision, Organization.id, Organization.updated_at)
+
+
+async def _fetch_after(
+    session: AsyncSession,
+    columns: tuple,
+    model: type,
+    rank: int,
+    position: tuple[int, int, int],
+    limit: int,
+) -> list[Row]:
+    """Rows of one source after ``position`` in (revision, rank, id) order."""
+    revision, position_rank, position_id = position
+    if rank > position_rank:
+        condition = model.revision >= revision
+    elif rank < position_rank:
+        condition = model.revision > revision
+    else:
+        condition = keyset_after([model.revision, model.id], [revision, position_id])
+    stmt = (
+        select(*columns)
+        .where(condition)
+        .order_by(model.revision.asc(), model.id.asc())
+        .limit(limit + 1)
+    )
+    return (await session.execute(stmt)).all()
+
+
+def _upsert(entity: str, row: Row) -> dict:
+    item = {
+        "revision": row.revision,
+        "type": entity,
+        "op": "upsert",
+        "id": row.id,
+        "updated_at": _isoformat(row.updated_at),
+    }
+    if entity == ACTIVITY:
+        item["data"] = {"id": row.id, "name": row.name, "parent_id": row.parent_id, "level": row.level}
+    elif entity == BUILDING:
+        item["data"] = serialize_building(row)
+    return item
+
+
+def _deletion(row: Row) -> dict:
+    return {
+        "revision": row.revision,
+        "type": row.entity,
+        "op": "delete",
+        "id": row.entity_id,
+        "updated_at": _isoformat(row.deleted_at),
+    }
+
+
+async def _attach_organization_cards(session: AsyncSession, items: list[dict]) -> None:
+    pending = [item for item in items if item["type"] == ORGANIZATION and item["op"] == "upsert"]
+    if not pending:
+        return
+    cards = await get_organizations_batch(session, [item["id"] for item in pending])
+    by_id = {card.id: serialize_organization(card) for card in cards}
+    for item in pending:
+        item["data"] = by_id.get(item["id"])
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite drops the offset; values are always written in UTC.
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
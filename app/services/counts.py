@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from typing import Literal
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.config import get_settings
+from app.db.session import get_dialect_name
+from app.services.versions import data_versions, read_versions
+
+TotalMode = Literal["exact", "estimate"]
+
+
+class CountCache:
+    """Bounded TTL cache of COUNT results keyed by normalized filters."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[Hashable, tuple[float, int]] = OrderedDict()
+
+    def get(self, key: Hashable) -> int | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: int) -> None:
+        settings = get_settings()
+        self._entries[key] = (time.monotonic() + settings.count_cache_ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.count_cache_max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+async def count_rows(
+    session: AsyncSession,
+    stmt: Select,
+    *,
+    key: Hashable,
+    datasets: Sequence[str],
+    mode: TotalMode = "exact",
+    table_name: str | None = None,
+) -> int:
+    """Count the rows ``stmt`` would return, reusing recent results.
+
+    ``table_name`` marks an unfiltered listing of that table; only those can
+    be answered from planner statistics in ``estimate`` mode.
+    """
+    if mode == "estimate" and table_name is not None:
+        estimate = await _planner_estimate(session, table_name)
+        if estimate is not None:
+            return estimate
+
+    # Data versions are part of the key, so writes invalidate counts at once
+    # and the TTL only bounds staleness across workers.
+    versions = await data_versions.current()
+    total = count_cache.get((key, tuple(versions.get(name) for name in datasets)))
+    if total is None:
+        # Stored under the markers of the node that counted, which may lag.
+        loaded = await read_versions(session)
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        total = await session.scalar(count_stmt)
+        count_cache.set((key, tuple(loaded.get(name) for name in datasets)), total)
+    return total
+
+
+async def _planner_estimate(session: AsyncSession, table_name: str) -> int | None:
+    if get_dialect_name(session) != "postgresql":
+        return None
+    estimate = await session.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    )
+    # reltuples is -1 until the table has been vacuumed or analyzed.
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
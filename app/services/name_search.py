@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from sqlalchemy import column, func, select, table
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.models.entities import Organization
+
+# Trigram indexes cannot serve patterns shorter than one trigram.
+MIN_INDEXED_QUERY_LENGTH = 3
+
+_organizations_fts = table(
+    "organizations_fts",
+    column("rowid"),
+    column("rank"),
+    column("name"),
+)
+
+
+def apply_name_search(
+    stmt: Select,
+    dialect_name: str,
+    query: str,
+) -> tuple[Select, ColumnElement | None]:
+    """Filter ``stmt`` by organization name using the dialect's index.
+
+    Returns the filtered statement and a relevance expression where lower
+    values rank higher, or ``None`` when the backend cannot rank matches.
+    """
+    if dialect_name == "sqlite" and len(query) >= MIN_INDEXED_QUERY_LENGTH:
+        matches = _fts_matches(query).subquery("name_matches")
+        stmt = stmt.join(matches, matches.c.organization_id == Organization.id)
+        return stmt, matches.c.relevance
+
+    stmt = stmt.where(Organization.name.ilike(_contains_pattern(query), escape="\\"))
+    if dialect_name == "postgresql":
+        return stmt, -func.similarity(Organization.name, query)
+    return stmt, None
+
+
+def _fts_matches(query: str) -> Select:
+    # A quoted FTS5 string is a phrase; with the trigram tokenizer it
+    # matches any name containing the query as a substring.
+    phrase = '"' + query.replace('"', '""') + '"'
+    return select(
+        _organizations_fts.c.rowid.label("organization_id"),
+        _organizations_fts.c.rank.label("relevance"),
+    ).where(_organizations_fts.c.name.match(phrase))
+
+
+def _contains_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
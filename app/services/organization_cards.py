@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from sqlalchemy import JSON, func, literal_column, select, type_coerce
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.models.entities import (
+    Activity,
+    Building,
+    Organization,
+    OrganizationPhone,
+    organization_activity_table,
+)
+
+
+def card_columns(dialect_name: str) -> list[ColumnElement]:
+    """Columns of one organization card per row.
+
+    Phones and activities are aggregated into JSON arrays by correlated
+    subqueries, so a page of cards is a single query without ORM objects.
+    """
+    return [
+        Organization.id,
+        Organization.name,
+        Organization.building_id,
+        Building.city,
+        Building.address,
+        Building.latitude,
+        Building.longitude,
+        _phones_json(dialect_name).label("phones"),
+        _activities_json(dialect_name).label("activities"),
+    ]
+
+
+def select_cards(stmt: Select, dialect_name: str) -> Select:
+    """Turn a filtered ``select(Organization)`` into a card query."""
+    return stmt.with_only_columns(*card_columns(dialect_name)).join(
+        Building,
+        Building.id == Organization.building_id,
+    )
+
+
+def _phones_json(dialect_name: str) -> ColumnElement:
+    phone = OrganizationPhone.phone
+    owned = OrganizationPhone.organization_id == Organization.id
+    if dialect_name == "postgresql":
+        aggregated = func.json_agg(aggregate_order_by(phone, phone))
+        return _json_or_empty(select(aggregated).where(owned).scalar_subquery())
+
+    # SQLite before 3.44 has no ORDER BY inside aggregates; it aggregates
+    # an ordered subquery in order.
+    ordered = (
+        select(phone.label("phone"))
+        .where(owned)
+        .order_by(phone)
+        .correlate(Organization)
+        .subquery()
+    )
+    return type_coerce(select(func.json_group_array(ordered.c.phone)).scalar_subquery(), JSON)
+
+
+def _activities_json(dialect_name: str) -> ColumnElement:
+    links = Activity.__table__.join(
+        organization_activity_table,
+        organization_activity_table.c.activity_id == Activity.id,
+    )
+    owned = organization_activity_table.c.organization_id == Organization.id
+    if dialect_name == "postgresql":
+        item = func.json_build_object(
+            "id", Activity.id,
+            "name", Activity.name,
+            "level", Activity.level,
+            "parent_id", Activity.parent_id,
+        )
+        aggregated = func.json_agg(aggregate_order_by(item, Activity.level, Activity.name))
+        return _json_or_empty(select(aggregated).select_from(links).where(owned).scalar_subquery())
+
+    rows = (
+        select(Activity.id, Activity.name, Activity.level, Activity.parent_id)
+        .select_from(links)
+        .where(owned)
+        .order_by(Activity.level, Activity.name)
+        .correlate(Organization)
+        .subquery()
+    )
+    item = func.json_object(
+        "id", rows.c.id,
+        "name", rows.c.name,
+        "level", rows.c.level,
+        "parent_id", rows.c.parent_id,
+    )
+    return type_coerce(select(func.json_group_array(item)).scalar_subquery(), JSON)
+
+
+def _json_or_empty(aggregated: ColumnElement) -> ColumnElement:
+    # json_agg over no rows is NULL rather than an empty array.
+    return type_coerce(func.coalesce(aggregated, literal_column("'[]'::json")), JSON)
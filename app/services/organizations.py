@@ -1,14 +1,61 @@
 from __future__ import annotations
 
 import math
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, bindparam, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import Select
 
-from app.models.entities import Activity, Building, Organization
+from app.core.config import get_settings
+from app.db.session import get_dialect_name
+from app.models.entities import (
+    Building,
+    Organization,
+    activity_closure_table,
+    organization_activity_table,
+)
+from app.services.activities import get_activity_hierarchy
+from app.services.counts import TotalMode, count_rows
+from app.services.name_search import apply_name_search
+from app.services.organization_cards import select_cards
+from app.services.pagination import Page, build_page, decode_cursor, keyset_after
+from app.services.spatial import EARTH_RADIUS_KM, get_building_index, search_area
+from app.services.versions import ACTIVITIES, BUILDINGS, ORGANIZATIONS
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Global search criteria; geo parameters are validated by the API layer."""
+
+    lat: float | None = None
+    lon: float | None = None
+    radius_km: float | None = None
+    min_lat: float | None = None
+    max_lat: float | None = None
+    min_lon: float | None = None
+    max_lon: float | None = None
+    query: str | None = None
+    activity_id: int | None = None
+
+    @property
+    def circle(self) -> tuple[float, float, float] | None:
+        if self.lat is None or self.lon is None or self.radius_km is None:
+            return None
+        return self.lat, self.lon, self.radius_km
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float] | None:
+        bbox = (self.min_lat, self.max_lat, self.min_lon, self.max_lon)
+        if None in bbox:
+            return None
+        return bbox
+
+    @property
+    def is_empty(self) -> bool:
+        return self == SearchFilters()
 
 
 async def list_organizations_for_building(
@@ -18,106 +65,234 @@ async def list_organizations_for_building(
     *,
     limit: int,
     offset: int,
-) -> list[Organization]:
+    cursor: str | None = None,
+) -> Page[Row]:
     await _ensure_building_exists(session, building_id)
-    stmt: Select[Organization] = (
-        select(Organization)
-        .options(
-            selectinload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities),
-        )
-        .where(Organization.building_id == building_id)
-        .order_by(Organization.name.asc())
+    stmt = await _building_statement(session, building_id, activity_id)
+    stmt = (
+        select_cards(stmt, get_dialect_name(session))
+        .order_by(Organization.name.asc(), Organization.id.asc())
         .offset(offset)
-        .limit(limit)
+        .limit(limit + 1)
     )
+    if cursor is not None:
+        after = decode_cursor(cursor, str, int)
+        stmt = stmt.where(keyset_after([Organization.name, Organization.id], after))
 
-    if activity_id is not None:
-        descendant_ids = await _collect_activity_branch(session, activity_id)
-        stmt = stmt.where(
-            Organization.activities.any(Activity.id.in_(descendant_ids))
-        )
+    result = await session.execute(stmt)
+    return build_page(result.all(), limit, lambda card: [card.name, card.id])
 
-    result = await session.scalars(stmt)
-    return list(result)
+
+async def count_organizations_for_building(
+    session: AsyncSession,
+    building_id: int,
+    activity_id: int | None,
+    *,
+    mode: TotalMode = "exact",
+) -> int:
+    stmt = await _building_statement(session, building_id, activity_id)
+    return await count_rows(
+        session,
+        stmt,
+        key=("organizations_for_building", building_id, activity_id),
+        datasets=(ORGANIZATIONS, ACTIVITIES),
+        mode=mode,
+    )
 
 
 async def search_organizations(
     session: AsyncSession,
+    filters: SearchFilters,
+    *,
+    limit: int,
+    offset: int,
+    cursor: str | None = None,
+) -> Page[Row]:
+    stmt, sort_keys = await _search_statement(session, filters)
+    if stmt is None:
+        return Page(items=[], next_cursor=None)
+
+    if cursor is not None:
+        # Relevance keys are floats; the (name, id) tail is always present.
+        cursor_types = (float,) * (len(sort_keys) - 2) + (str, int)
+        stmt = stmt.where(keyset_after(sort_keys, decode_cursor(cursor, *cursor_types)))
+
+    relevance_keys = sort_keys[:-2]
+    stmt = (
+        select_cards(stmt, get_dialect_name(session))
+        .add_columns(*(key.label(f"relevance_{i}") for i, key in enumerate(relevance_keys)))
+        .order_by(*(key.asc() for key in sort_keys))
+        .offset(offset)
+        .limit(limit + 1)
+    )
+
+    # Relevance values trail the card columns when ranking by name.
+    relevance_start = len(stmt.selected_columns) - len(relevance_keys)
+    rows = (await session.execute(stmt)).all()
+    return build_page(rows, limit, lambda card: [*card[relevance_start:], card.name, card.id])
+
+
+async def stream_organizations(
+    session: AsyncSession,
+    filters: SearchFilters,
     *,
-    lat: float | None = None,
-    lon: float | None = None,
-    radius_km: float | None = None,
-    min_lat: float | None = None,
-    max_lat: float | None = None,
-    min_lon: float | None = None,
-        max_lon: float | None = None,
-        query: str | None = None,
-        activity_id: int | None = None,
-        limit: int,
-        offset: int,
-) -> list[Organization]:
-    stmt: Select[Organization] = (
-        select(Organization)
-        .options(
-            selectinload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities),
-        )
-        .order_by(Organization.name.asc())
+    batch_size: int,
+) -> AsyncIterator[list[Row]]:
+    """Return an iterator over matching organization cards in id order, in batches.
+
+    Filters are validated eagerly so errors surface before streaming starts;
+    rows are then fetched through a server-side cursor as batches are consumed.
+    """
+    stmt, _ = await _search_statement(session, filters)
+    return _iterate_batches(session, stmt, batch_size)
+
+
+async def _iterate_batches(
+    session: AsyncSession,
+    stmt: Select | None,
+    batch_size: int,
+) -> AsyncIterator[list[Row]]:
+    if stmt is None:
+        return
+    stmt = (
+        select_cards(stmt, get_dialect_name(session))
+        .order_by(Organization.id.asc())
+        .execution_options(yield_per=batch_size)
     )
+    result = await session.stream(stmt)
+    async for batch in result.partitions():
+        yield list(batch)
 
-    filters = []
+
+async def count_search_organizations(
+    session: AsyncSession,
+    filters: SearchFilters,
+    *,
+    mode: TotalMode = "exact",
+) -> int:
+    stmt, _ = await _search_statement(session, filters)
+    if stmt is None:
+        return 0
+    return await count_rows(
+        session,
+        stmt,
+        key=("search_organizations", filters),
+        datasets=(ORGANIZATIONS, ACTIVITIES, BUILDINGS),
+        mode=mode,
+        table_name=Organization.__tablename__ if filters.is_empty else None,
+    )
+
+
+async def _building_statement(
+    session: AsyncSession,
+    building_id: int,
+    activity_id: int | None,
+) -> Select:
+    stmt = select(Organization).where(Organization.building_id == building_id)
     if activity_id is not None:
-        descendant_ids = await _collect_activity_branch(session, activity_id)
-        filters.append(Organization.activities.any(Activity.id.in_(descendant_ids)))
-    if query:
-        filters.append(Organization.name.ilike(f"%{query}%"))
-
-    building_filters: list = []
-    if min_lat is not None:
-        building_filters.append(Building.latitude >= min_lat)
-    if max_lat is not None:
-        building_filters.append(Building.latitude <= max_lat)
-    if min_lon is not None:
-        building_filters.append(Building.longitude >= min_lon)
-    if max_lon is not None:
-        building_filters.append(Building.longitude <= max_lon)
-
-    # Circle filter narrows down via bounding box to minimize rows fetched.
-    if lat is not None and lon is not None and radius_km is not None:
-        lat_delta = _km_to_lat_delta(radius_km)
-        lon_delta = _km_to_lon_delta(radius_km, lat)
-        building_filters.extend(
-            [
-                Building.latitude >= lat - lat_delta,
-                Building.latitude <= lat + lat_delta,
-                Building.longitude >= lon - lon_delta,
-                Building.longitude <= lon + lon_delta,
-            ]
-        )
-
-    if building_filters:
-        stmt = stmt.join(Building)
-        filters.extend(building_filters)
-
-    if filters:
-        stmt = stmt.where(*filters)
-
-    stmt = stmt.offset(offset).limit(limit)
-
-    result = await session.scalars(stmt)
-    organizations = list(result)
-
-    if lat is not None and lon is not None and radius_km is not None:
-        organizations = [
-            org
-            for org in organizations
-            if _match_geo_filters(org, lat, lon, radius_km, min_lat, max_lat, min_lon, max_lon)
-        ]
-
-    return organizations
+        await _ensure_activity_exists(session, activity_id)
+        stmt = stmt.where(_activity_branch_clause(activity_id))
+    return stmt
+
+
+async def _search_statement(
+    session: AsyncSession,
+    filters: SearchFilters,
+) -> tuple[Select | None, list]:
+    """Build the filtered search statement and its sort keys.
+
+    Returns ``None`` instead of a statement when the geo filters match no
+    buildings at all.
+    """
+    stmt = select(Organization)
+    if filters.activity_id is not None:
+        await _ensure_activity_exists(session, filters.activity_id)
+        stmt = stmt.where(_activity_branch_clause(filters.activity_id))
+
+    sort_keys = [Organization.name, Organization.id]
+    if filters.query:
+        stmt, relevance = apply_name_search(stmt, get_dialect_name(session), filters.query)
+        if relevance is not None:
+            sort_keys.insert(0, relevance)
+
+    # The spatial index resolves geo filters to exact building ids, so pages
+    # are never thinned out by a post-LIMIT distance check.
+    if filters.circle is not None or filters.bbox is not None:
+        index = await get_building_index(session)
+        building_ids = index.search(circle=filters.circle, bbox=filters.bbox)
+        if not building_ids:
+            return None, sort_keys
+        if len(building_ids) > get_settings().spatial_inline_ids_max:
+            stmt = stmt.where(_building_area_clause(filters))
+        else:
+            stmt = stmt.where(_building_ids_clause(building_ids))
+
+    return stmt, sort_keys
+
+
+def _building_ids_clause(building_ids: list[int]):
+    # Rendering the ids inline keeps the set clear of the driver's
+    # bind-parameter limit; larger sets use _building_area_clause.
+    return Organization.building_id.in_(
+        bindparam("building_ids", building_ids, expanding=True, literal_execute=True)
+    )
+
+
+def _building_area_clause(filters: SearchFilters):
+    """Match the same buildings as the spatial index, filtered in SQL.
+
+    Used for city-sized areas, where an inline id list would make every
+    statement long and distinct. The coordinate ranges use the latitude and
+    longitude indexes; the circle check is the exact great-circle distance.
+    """
+    min_lat, max_lat, min_lon, max_lon = search_area(circle=filters.circle, bbox=filters.bbox)
+    buildings = select(Building.id).where(
+        Building.latitude.between(min_lat, max_lat),
+        Building.longitude.between(min_lon, max_lon),
+    )
+    if filters.circle is not None:
+        lat, lon, radius_km = filters.circle
+        buildings = buildings.where(_cos_angle(lat, lon) >= math.cos(radius_km / EARTH_RADIUS_KM))
+    return Organization.building_id.in_(buildings)
+
+
+def _cos_angle(lat: float, lon: float):
+    """Cosine of the central angle between the point and each building."""
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    return (
+        Building.lat_sin * math.sin(lat_rad)
+        + Building.lat_cos
+        * math.cos(lat_rad)
+        * (Building.lon_cos * math.cos(lon_rad) + Building.lon_sin * math.sin(lon_rad))
+    )
+
+
+async def find_nearest_organizations(
+    session: AsyncSession,
+    *,
+    lat: float,
+    lon: float,
+    k: int,
+) -> list[tuple[Row, float]]:
+    """Return the ``k`` organizations closest to the point with distances in km.
+
+    The cosine of the central angle is a plain arithmetic expression over the
+    precomputed building columns, so the database orders and limits the rows.
+    """
+    cos_angle = _cos_angle(lat, lon).label("cos_angle")
+
+    stmt = (
+        select_cards(select(Organization), get_dialect_name(session))
+        .add_columns(cos_angle)
+        .order_by(cos_angle.desc(), Organization.name.asc(), Organization.id.asc())
+        .limit(k)
+    )
+    result = await session.execute(stmt)
+    return [
+        (card, EARTH_RADIUS_KM * math.acos(max(-1.0, min(1.0, card.cos_angle))))
+        for card in result.all()
+    ]
 
 
 async def _ensure_building_exists(session: AsyncSession, building_id: int) -> None:
@@ -127,122 +302,60 @@ async def _ensure_building_exists(session: AsyncSession, building_id: int) -> No
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Building not found")
 
 
-async def _collect_activity_branch(session: AsyncSession, activity_id: int) -> set[int]:
-    exists_stmt = select(Activity.id).where(Activity.id == activity_id)
-    base_activity = await session.scalar(exists_stmt)
-    if base_activity is None:
+async def _ensure_activity_exists(session: AsyncSession, activity_id: int) -> None:
+    hierarchy = await get_activity_hierarchy(session)
+    if activity_id not in hierarchy:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Activity not found")
 
-    collected: set[int] = {activity_id}
-    frontier: set[int] = {activity_id}
-
-    while frontier:
-        children_stmt = select(Activity.id).where(Activity.parent_id.in_(frontier))
-        rows = await session.scalars(children_stmt)
-        child_ids = set(rows.all())
-        new_ids = child_ids.difference(collected)
-        if not new_ids:
-            break
-        collected.update(new_ids)
-        frontier = new_ids
-
-    return collected
-
-
-def serialize_organization(org: Organization) -> dict:
-    building = org.building
-    phones = [phone.phone for phone in sorted(org.phones, key=lambda p: p.phone)]
-    activities = [
-        {
-            "id": activity.id,
-            "name": activity.name,
-            "level": activity.level,
-            "parent_id": activity.parent_id,
-        }
-        for activity in sorted(
-            org.activities,
-            key=lambda a: (a.level, a.name),
-        )
-    ]
+
+def _activity_branch_clause(activity_id: int):
+    """Match organizations linked to the activity or any of its descendants."""
+    return exists().where(
+        activity_closure_table.c.ancestor_id == activity_id,
+        organization_activity_table.c.activity_id == activity_closure_table.c.descendant_id,
+        organization_activity_table.c.organization_id == Organization.id,
+    )
+
+
+def serialize_organization(card: Row) -> dict:
+    """Render a row from :func:`select_cards` in the API shape."""
     return {
-        "id": org.id,
-        "name": org.name,
-        "phones": phones,
+        "id": card.id,
+        "name": card.name,
+        "phones": card.phones,
         "building": {
-            "id": building.id,
-            "city": building.city,
-            "address": building.address,
-            "location": {"lat": building.latitude, "lon": building.longitude},
+            "id": card.building_id,
+            "city": card.city,
+            "address": card.address,
+            "location": {"lat": card.latitude, "lon": card.longitude},
         },
-        "activities": activities,
+        "activities": card.activities,
     }
 
 
 async def get_organization_detail(
     session: AsyncSession,
     organization_id: int,
-) -> Organization:
-    stmt = (
-        select(Organization)
-        .options(
-            selectinload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities),
-        )
-        .where(Organization.id == organization_id)
+) -> Row:
+    stmt = select_cards(
+        select(Organization).where(Organization.id == organization_id),
+        get_dialect_name(session),
     )
-    organization = await session.scalar(stmt)
-    if organization is None:
+    card = (await session.execute(stmt)).first()
+    if card is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Organization not found")
-    return organization
-
-
-def _match_geo_filters(
-    org: Organization,
-    lat: float | None,
-    lon: float | None,
-    radius_km: float | None,
-    min_lat: float | None,
-    max_lat: float | None,
-    min_lon: float | None,
-    max_lon: float | None,
-) -> bool:
-    building = org.building
-    if min_lat is not None and building.latitude < min_lat:
-        return False
-    if max_lat is not None and building.latitude > max_lat:
-        return False
-    if min_lon is not None and building.longitude < min_lon:
-        return False
-    if max_lon is not None and building.longitude > max_lon:
-        return False
-
-    if lat is not None and lon is not None and radius_km is not None:
-        distance = _haversine_km(lat, lon, building.latitude, building.longitude)
-        if distance > radius_km:
-            return False
-
-    return True
-
-
-def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    r = 6371.0
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    d_phi = math.radians(lat2 - lat1)
-    d_lambda = math.radians(lon2 - lon1)
-
-    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return r * c
-
-
-def _km_to_lat_delta(radius_km: float) -> float:
-    return radius_km / 111.0
-
-
-def _km_to_lon_delta(radius_km: float, lat: float) -> float:
-    base = math.cos(math.radians(lat)) * 111.0
-    if base == 0:
-        return radius_km / 111.0
-    return radius_km / base
+    return card
+
+
+async def get_organizations_batch(
+    session: AsyncSession,
+    organization_ids: list[int],
+) -> list[Row]:
+    """Load many organization cards in one query, in the requested order."""
+    stmt = select_cards(
+        select(Organization).where(Organization.id.in_(organization_ids)),
+        get_dialect_name(session),
+    )
+    result = await session.execute(stmt)
+    by_id = {card.id: card for card in result}
+    return [by_id[org_id] for org_id in organization_ids if org_id in by_id]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import ColumnElement
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: str | None
+
+
+def ensure_single_pagination_mode(cursor: str | None, offset: int) -> None:
+    if cursor is not None and offset:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Параметры cursor и offset нельзя передавать одновременно.",
+        )
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> list[Any]:
+    """Decode a cursor whose values must match ``types`` position by position."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(_matches_type(value, type_) for value, type_ in zip(values, types))
+    ):
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, "Invalid cursor")
+    return values
+
+
+def keyset_after(columns: Sequence[ColumnElement], values: Sequence[Any]) -> ColumnElement:
+    """Rows strictly after ``values`` in ascending ``columns`` order.
+
+    Expanded into ``OR``/``AND`` form rather than a row-value comparison so
+    that it works on every backend and can use the leading index column.
+    """
+    clause = columns[-1] > values[-1]
+    for column, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+        clause = or_(column > value, and_(column == value, clause))
+    return clause
+
+
+def build_page(rows: list[T], limit: int, cursor_of) -> Page[T]:
+    """Trim a ``limit + 1`` fetch into a page and its continuation cursor."""
+    if len(rows) <= limit:
+        return Page(items=rows, next_cursor=None)
+    items = rows[:limit]
+    return Page(items=items, next_cursor=encode_cursor(cursor_of(items[-1])))
+
+
+def _matches_type(value: Any, type_: type) -> bool:
+    if isinstance(value, bool):
+        return False
+    if type_ is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, type_)
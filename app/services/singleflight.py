@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+single_flight_calls_total = registry.counter(
+    "single_flight_calls_total",
+    "Coalesced calls: leader ran the call, shared reused its result, "
+    "fallback waited too long or lost its leader and ran the call itself.",
+    ("name", "outcome"),
+)
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight call among concurrent callers with the same key.
+
+    The first caller runs the call; callers arriving while it is in flight
+    wait for its result or exception instead of repeating the work. Nothing
+    is cached: once the call finishes, the next caller starts a new one, so
+    results are never staler than an uncoalesced call would be.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._in_flight: dict[Hashable, asyncio.Future[T]] = {}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]], *, wait_seconds: float) -> T:
+        """Return ``call()``'s result, shared with concurrent callers of ``key``.
+
+        Waiting callers give up after ``wait_seconds`` and run the call
+        themselves, as they do when the leading caller is cancelled.
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), wait_seconds)
+            except asyncio.TimeoutError:
+                if future.done() and not future.cancelled():
+                    raise
+            except asyncio.CancelledError:
+                # Our own cancellation, unless the leader's future was cancelled.
+                if not future.cancelled():
+                    raise
+            else:
+                single_flight_calls_total.inc(name=self.name, outcome="shared")
+                return result
+            single_flight_calls_total.inc(name=self.name, outcome="fallback")
+            return await call()
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        single_flight_calls_total.inc(name=self.name, outcome="leader")
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved; without followers nobody awaits it.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.entities import Building
+from app.services.versions import BUILDINGS, data_versions, read_versions
+
+EARTH_RADIUS_KM = 6371.0
+
+Point = tuple[int, float, float]
+
+
+class BuildingGridIndex:
+    """Uniform lat/lon grid over building coordinates.
+
+    Each cell holds ``(building_id, lat, lon)`` tuples, so radius and bbox
+    queries only touch the cells overlapping the search area and then apply
+    the exact predicate in memory.
+    """
+
+    def __init__(self, points: Iterable[Point], *, cell_deg: float, version: str | None) -> None:
+        self.cell_deg = cell_deg
+        self.version = version
+        self._cells: dict[tuple[int, int], list[Point]] = {}
+        self.size = 0
+        for point in points:
+            self._cells.setdefault(self._cell_of(point[1], point[2]), []).append(point)
+            self.size += 1
+
+    def search(
+        self,
+        *,
+        circle: tuple[float, float, float] | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+    ) -> list[int]:
+        """Return ids of buildings inside the circle and/or the bbox.
+
+        ``circle`` is ``(lat, lon, radius_km)``, ``bbox`` is
+        ``(min_lat, max_lat, min_lon, max_lon)``. When both are given the
+        intersection is returned.
+        """
+        area = search_area(circle=circle, bbox=bbox)
+        if area is None:
+            return []
+
+        min_lat, max_lat, min_lon, max_lon = area
+        matched: list[int] = []
+        for point in self._candidates(min_lat, max_lat, min_lon, max_lon):
+            building_id, point_lat, point_lon = point
+            if not (min_lat <= point_lat <= max_lat and min_lon <= point_lon <= max_lon):
+                continue
+            if circle is not None and haversine_km(circle[0], circle[1], point_lat, point_lon) > circle[2]:
+                continue
+            matched.append(building_id)
+
+        matched.sort()
+        return matched
+
+    def _candidates(
+        self,
+        min_lat: float,
+        max_lat: float,
+        min_lon: float,
+        max_lon: float,
+    ) -> Iterable[Point]:
+        low_row, low_col = self._cell_of(min_lat, min_lon)
+        high_row, high_col = self._cell_of(max_lat, max_lon)
+        area_cells = (high_row - low_row + 1) * (high_col - low_col + 1)
+
+        # Huge areas cover more grid positions than there are populated
+        # cells; walking the populated cells is cheaper then.
+        if area_cells > len(self._cells):
+            for (row, col), points in self._cells.items():
+                if low_row <= row <= high_row and low_col <= col <= high_col:
+                    yield from points
+            return
+
+        for row in range(low_row, high_row + 1):
+            for col in range(low_col, high_col + 1):
+                yield from self._cells.get((row, col), ())
+
+    def _cell_of(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+
+def search_area(
+    *,
+    circle: tuple[float, float, float] | None = None,
+    bbox: tuple[float, float, float, float] | None = None,
+) -> tuple[float, float, float, float] | None:
+    """Return the lat/lon range enclosing the circle and/or the bbox.
+
+    ``None`` means the circle and the bbox do not overlap.
+    """
+    if circle is None and bbox is None:
+        raise ValueError("circle or bbox is required")
+
+    area = bbox
+    if circle is not None:
+        lat, lon, radius_km = circle
+        lat_delta = _km_to_lat_delta(radius_km)
+        # Meridians converge towards the poles, so the widest longitude
+        # span of the circle is at its edge farthest from the equator.
+        lon_delta = _km_to_lon_delta(radius_km, min(abs(lat) + lat_delta, 90.0))
+        circle_area = (lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta)
+        area = circle_area if area is None else _intersect(area, circle_area)
+    return area
+
+
+_building_index: BuildingGridIndex | None = None
+
+
+async def get_building_index(session: AsyncSession) -> BuildingGridIndex:
+    """Return the process-local index, rebuilding it when buildings changed."""
+    global _building_index
+
+    version = await data_versions.version_of(BUILDINGS)
+    index = _building_index
+    if index is not None and index.version == version:
+        return index
+
+    # A lagging replica has not seen the change yet; keep the index it
+    # matches instead of rebuilding it on every request until it catches up.
+    version = (await read_versions(session)).get(BUILDINGS)
+    if index is not None and index.version == version:
+        return index
+
+    rows = await session.execute(select(Building.id, Building.latitude, Building.longitude))
+    index = BuildingGridIndex(
+        rows.all(),
+        cell_deg=get_settings().spatial_index_cell_deg,
+        version=version,
+    )
+    _building_index = index
+    return index
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def _intersect(
+    first: tuple[float, float, float, float],
+    second: tuple[float, float, float, float],
+) -> tuple[float, float, float, float] | None:
+    min_lat = max(first[0], second[0])
+    max_lat = min(first[1], second[1])
+    min_lon = max(first[2], second[2])
+    max_lon = min(first[3], second[3])
+    if min_lat > max_lat or min_lon > max_lon:
+        return None
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def _km_to_lat_delta(radius_km: float) -> float:
+    return radius_km / 111.0
+
+
+def _km_to_lon_delta(radius_km: float, lat: float) -> float:
+    base = math.cos(math.radians(lat)) * 111.0
+    if base == 0:
+        return radius_km / 111.0
+    return radius_km / base
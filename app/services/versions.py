@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Iterable
+from itertools import chain
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import session as db_session
+from app.models.entities import Activity, Building, DataVersion, Organization, OrganizationPhone
+
+BUILDINGS = "buildings"
+ACTIVITIES = "activities"
+ORGANIZATIONS = "organizations"
+ALL_DATASETS = (BUILDINGS, ACTIVITIES, ORGANIZATIONS)
+
+_DATASET_BY_MODEL: dict[type, str] = {
+    Building: BUILDINGS,
+    Activity: ACTIVITIES,
+    Organization: ORGANIZATIONS,
+    OrganizationPhone: ORGANIZATIONS,
+}
+
+
+class DataVersionMonitor:
+    """Process-wide snapshot of the ``data_versions`` markers on the primary.
+
+    The snapshot is re-read at most once per ``data_version_poll_seconds`` so
+    in-memory caches can validate themselves without a query per request.
+    Changes committed by this process invalidate it immediately.
+
+    Replicas may lag behind it, so a cache entry must be tagged with the
+    markers from ``read_versions`` on the session that loaded it, not with
+    this snapshot; otherwise old rows would be stored under a newer version.
+    """
+
+    def __init__(self) -> None:
+        self._versions: dict[str, str] | None = None
+        self._checked_at = 0.0
+
+    async def current(self) -> dict[str, str]:
+        now = time.monotonic()
+        poll_seconds = get_settings().data_version_poll_seconds
+        if self._versions is None or now - self._checked_at >= poll_seconds:
+            async with db_session.AsyncSessionFactory() as session:
+                self._versions = await read_versions(session)
+            self._checked_at = now
+        return self._versions
+
+    async def version_of(self, name: str) -> str | None:
+        versions = await self.current()
+        return versions.get(name)
+
+    def invalidate(self) -> None:
+        self._versions = None
+
+
+data_versions = DataVersionMonitor()
+
+
+async def read_versions(session: AsyncSession) -> dict[str, str]:
+    """Read the markers on ``session``'s own connection.
+
+    Call it before loading the rows it tags: a write committed in between
+    then only makes the entry fresher than its tag, never older.
+    """
+    rows = await session.execute(select(DataVersion.name, DataVersion.version))
+    return {name: version for name, version in rows.all()}
+
+
+async def bump_data_versions(session: AsyncSession, *names: str) -> None:
+    """Mark datasets as changed; used by writers that bypass the ORM."""
+    await session.run_sync(lambda sync_session: _write_versions(sync_session, names))
+
+
+def _write_versions(session: Session, names: Iterable[str]) -> None:
+    connection: Connection = session.connection()
+    for name in sorted(set(names)):
+        version = uuid.uuid4().hex
+        result = connection.execute(
+            update(DataVersion).where(DataVersion.name == name).values(version=version)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(DataVersion).values(name=name, version=version))
+    session.info["data_versions_bumped"] = True
+    data_versions.invalidate()
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_versions_after_flush(session: Session, _flush_context) -> None:
+    names = {
+        _DATASET_BY_MODEL[type(instance)]
+        for instance in chain(session.new, session.dirty, session.deleted)
+        if type(instance) in _DATASET_BY_MODEL
+    }
+    if names:
+        _write_versions(session, names)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop("data_versions_bumped", False):
+        data_versions.invalidate()
@@ -0,0 +1,321 @@
+"""Replay recorded HTTP traffic against the API and report per-route latency.
+
+Usage::
+
+    python -m benchmarks.loadtest benchmarks/traffic.sample.jsonl --concurrency 32 --duration 30
+    python -m benchmarks.loadtest traffic.jsonl --rate 200 --duration 60 --url http://localhost:8000
+
+Each line of the traffic file is a JSON object with ``method`` (default
+``GET``), ``path`` and optional ``params``, ``json`` and ``headers``. Without
+``--url`` requests go to the app in-process through ``ASGITransport``, using
+the configured ``DATABASE_URL``.
+
+``--concurrency`` runs a closed loop: that many clients send requests back to
+back. ``--rate`` runs an open loop with Poisson arrivals; latency is measured
+from the scheduled send time, so a saturated server cannot hide queueing by
+slowing the load generator down. Its connection pool is unlimited unless
+``--max-connections`` caps it, so requests do not queue inside the client.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from itertools import cycle
+from pathlib import Path
+
+import httpx
+
+from app.core.config import get_settings
+
+# Upper bounds of latency histogram buckets, in milliseconds.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+@dataclass(frozen=True)
+class RecordedRequest:
+    method: str
+    path: str
+    params: dict | None = None
+    json: object | None = None
+    headers: dict | None = None
+
+    @property
+    def route(self) -> str:
+        return f"{self.method} {_NUMERIC_SEGMENT.sub('/{id}', self.path)}"
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    client_errors: int = 0
+    server_errors: int = 0
+    failures: int = 0
+
+    def record(self, latency_ms: float, status_code: int | None) -> None:
+        self.latencies_ms.append(latency_ms)
+        if status_code is None:
+            self.failures += 1
+        elif status_code >= 500:
+            self.server_errors += 1
+        elif status_code >= 400:
+            self.client_errors += 1
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms)
+
+    def histogram(self) -> list[int]:
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for latency in self.latencies_ms:
+            counts[bisect.bisect_left(BUCKETS_MS, latency)] += 1
+        return counts
+
+    def summary(self, elapsed_s: float) -> dict:
+        percentiles = (
+            statistics.quantiles(self.latencies_ms, n=100, method="inclusive")
+            if self.count > 1
+            else [self.latencies_ms[0]] * 99
+        )
+        errors = self.client_errors + self.server_errors + self.failures
+        return {
+            "requests": self.count,
+            "throughput_rps": round(self.count / elapsed_s, 2),
+            "error_rate": round(errors / self.count, 4),
+            "client_errors": self.client_errors,
+            "server_errors": self.server_errors,
+            "failures": self.failures,
+            "p50_ms": round(percentiles[49], 2),
+            "p95_ms": round(percentiles[94], 2),
+            "p99_ms": round(percentiles[98], 2),
+            "max_ms": round(max(self.latencies_ms), 2),
+            "histogram": dict(zip([f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], self.histogram())),
+        }
+
+
+def read_traffic(path: Path) -> list[RecordedRequest]:
+    requests = []
+    with path.open(encoding="utf-8") as source:
+        for line in source:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            requests.append(
+                RecordedRequest(
+                    method=record.get("method", "GET").upper(),
+                    path=record["path"],
+                    params=record.get("params"),
+                    json=record.get("json"),
+                    headers=record.get("headers"),
+                )
+            )
+    if not requests:
+        raise ValueError(f"{path} contains no requests")
+    return requests
+
+
+@asynccontextmanager
+async def open_client(
+    url: str | None,
+    api_key: str | None,
+    max_connections: int | None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    headers = {"X-API-Key": api_key} if api_key else {}
+    if url is not None:
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=30) as client:
+            yield client
+        return
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://loadtest",
+            headers=headers,
+            timeout=30,
+        ) as client:
+            yield client
+
+
+async def send(
+    client: httpx.AsyncClient,
+    request: RecordedRequest,
+    stats: dict[str, RouteStats],
+    started: float,
+) -> None:
+    try:
+        response = await client.request(
+            request.method,
+            request.path,
+            params=request.params,
+            json=request.json,
+            headers=request.headers,
+        )
+        status_code: int | None = response.status_code
+    except httpx.HTTPError:
+        status_code = None
+    stats[request.route].record((time.perf_counter() - started) * 1000, status_code)
+
+
+async def run_closed_loop(
+    client: httpx.AsyncClient,
+    requests: list[RecordedRequest],
+    *,
+    concurrency: int,
+    deadline: float,
+    limit: int | None,
+    stats: dict[str, RouteStats],
+) -> None:
+    source = cycle(requests)
+    sent = 0
+
+    async def worker() -> None:
+        nonlocal sent
+        while time.perf_counter() < deadline and (limit is None or sent < limit):
+            sent += 1
+            await send(client, next(source), stats, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    requests: list[RecordedRequest],
+    *,
+    rate: float,
+    deadline: float,
+    limit: int | None,
+    stats: dict[str, RouteStats],
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    source = cycle(requests)
+    in_flight: set[asyncio.Task] = set()
+    scheduled = time.perf_counter()
+    sent = 0
+    while limit is None or sent < limit:
+        scheduled += rng.expovariate(rate)
+        if scheduled >= deadline:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(send(client, next(source), stats, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        sent += 1
+    await asyncio.gather(*in_flight)
+
+
+def print_report(stats: dict[str, RouteStats], elapsed_s: float) -> None:
+    header = f"{'route':<48} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    total = RouteStats()
+    for route in sorted(stats):
+        route_stats = stats[route]
+        summary = route_stats.summary(elapsed_s)
+        total.latencies_ms.extend(route_stats.latencies_ms)
+        total.client_errors += route_stats.client_errors
+        total.server_errors += route_stats.server_errors
+        total.failures += route_stats.failures
+        _print_row(route, summary)
+    if total.count:
+        _print_row("TOTAL", total.summary(elapsed_s))
+
+    print("\nlatency histogram (ms):")
+    labels = [f"<={bound}" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+    print(f"{'route':<48} " + " ".join(f"{label:>6}" for label in labels))
+    for route in sorted(stats):
+        print(f"{route:<48} " + " ".join(f"{count:>6}" for count in stats[route].histogram()))
+
+
+def _print_row(route: str, summary: dict) -> None:
+    print(
+        f"{route:<48} {summary['requests']:>7} {summary['throughput_rps']:>8.1f} "
+        f"{summary['error_rate'] * 100:>6.2f} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} "
+        f"{summary['p99_ms']:>8.2f} {summary['max_ms']:>8.2f}"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.splitlines()[0])
+    parser.add_argument("traffic", type=Path, help="JSONL file of recorded requests.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=16, help="Closed loop with this many clients.")
+    mode.add_argument("--rate", type=float, help="Open loop at this many requests per second.")
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        help="Client connection pool size; defaults to --concurrency, unlimited with --rate.",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests.")
+    parser.add_argument("--url", help="Base URL of a running server; in-process when omitted.")
+    parser.add_argument("--api-key", help="Defaults to the configured API_KEY.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for open-loop arrival times.")
+    parser.add_argument("--output", type=Path, help="Also write the per-route summary as JSON.")
+    return parser
+
+
+async def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    requests = read_traffic(args.traffic)
+    api_key = args.api_key or get_settings().api_key
+    stats: dict[str, RouteStats] = defaultdict(RouteStats)
+
+    max_connections = args.max_connections
+    if max_connections is None and args.rate is None:
+        max_connections = args.concurrency
+
+    async with open_client(args.url, api_key, max_connections=max_connections) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        if args.rate is not None:
+            await run_open_loop(
+                client,
+                requests,
+                rate=args.rate,
+                deadline=deadline,
+                limit=args.requests,
+                stats=stats,
+                seed=args.seed,
+            )
+        else:
+            await run_closed_loop(
+                client,
+                requests,
+                concurrency=args.concurrency,
+                deadline=deadline,
+                limit=args.requests,
+                stats=stats,
+            )
+        elapsed = time.perf_counter() - started
+
+    if not stats:
+        print("No requests were sent.", file=sys.stderr)
+        return 1
+    print_report(stats, elapsed)
+    if args.output is not None:
+        report = {route: stats[route].summary(elapsed) for route in sorted(stats)}
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,281 @@
+"""Service-level microbenchmarks against a generated SQLite directory.
+
+Usage::
+
+    python -m benchmarks.services --organizations 50000 --buildings 5000
+    python -m benchmarks.services --save-baseline
+    python -m benchmarks.services --baseline benchmarks/baseline.json
+
+Each case calls a service function directly with a fresh session, the way a
+request would, with ``app.db.session`` pointed at the generated database so
+the version monitor and in-process caches check the same data, and records wall time and the number of SQL statements. The
+process exits with status 1 when a case is slower than the baseline p95 by
+more than ``--tolerance`` or issues more statements per call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.db import session as db_session
+from app.db.base import Base
+from app.seeds.generator import CITIES, GeneratorConfig, build_activity_tree, iter_organizations
+from app.seeds.loader import load_records
+from app.services.activities import fetch_activity_subtree, fetch_activity_tree
+from app.services.buildings import list_buildings
+from app.services.organizations import (
+    SearchFilters,
+    get_organizations_batch,
+    list_organizations_for_building,
+    search_organizations,
+    serialize_organization,
+)
+
+DATA_DIR = Path(__file__).parent / ".data"
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+PAGE_SIZE = 20
+
+Case = Callable[[AsyncSession], Awaitable[object]]
+
+
+@dataclass
+class CaseResult:
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries_per_call: float
+
+
+class StatementCounter:
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_args) -> None:
+        self.count += 1
+
+
+async def prepare_database(config: GeneratorConfig, data_dir: Path = DATA_DIR) -> AsyncEngine:
+    """Point the app at the dataset's database, generating it on first use.
+
+    Services read data versions through the global engine, so the benchmark
+    replaces it rather than opening an engine of its own.
+    """
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / f"directory-{config.organizations}-{config.buildings}-{config.seed}.db"
+    exists = path.exists()
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    get_settings.cache_clear()
+    db_session.reset_engine()
+    engine = db_session.engine
+    if exists:
+        return engine
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        await load_records(
+            session,
+            build_activity_tree(),
+            iter_organizations(config),
+            truncate=True,
+        )
+    return engine
+
+
+def build_cases() -> dict[str, Case]:
+    _, lat, lon, *_ = CITIES[0]
+    root_activity_id = build_activity_tree()[0]["id"]
+    geo_filters = {
+        "none": {},
+        "circle": {"lat": lat, "lon": lon, "radius_km": 2.0},
+        "bbox": {"min_lat": lat - 0.02, "max_lat": lat + 0.02, "min_lon": lon - 0.03, "max_lon": lon + 0.03},
+    }
+
+    cases: dict[str, Case] = {}
+    for geo, with_query, with_activity in itertools.product(geo_filters, (False, True), (False, True)):
+        filters = SearchFilters(
+            **geo_filters[geo],
+            query="Север" if with_query else None,
+            activity_id=root_activity_id if with_activity else None,
+        )
+        name = f"search[geo={geo},query={int(with_query)},activity={int(with_activity)}]"
+        cases[name] = _search_case(filters)
+
+    async def building_listing(session: AsyncSession) -> object:
+        # Low building ids are the busiest in generated data.
+        return await list_organizations_for_building(session, 1, None, limit=PAGE_SIZE, offset=0)
+
+    async def building_listing_by_activity(session: AsyncSession) -> object:
+        return await list_organizations_for_building(
+            session, 1, root_activity_id, limit=PAGE_SIZE, offset=0
+        )
+
+    async def activity_tree(session: AsyncSession) -> object:
+        return await fetch_activity_tree(session)
+
+    async def activity_subtree(session: AsyncSession) -> object:
+        return await fetch_activity_subtree(session, root_activity_id)
+
+    async def serialize_page(session: AsyncSession) -> object:
+        cards = await get_organizations_batch(session, list(range(1, PAGE_SIZE + 1)))
+        return [serialize_organization(card) for card in cards]
+
+    async def buildings_listing(session: AsyncSession) -> object:
+        return await list_buildings(session, limit=PAGE_SIZE, offset=0)
+
+    cases["list_organizations_for_building"] = building_listing
+    cases["list_organizations_for_building[activity]"] = building_listing_by_activity
+    cases["fetch_activity_tree"] = activity_tree
+    cases["fetch_activity_subtree"] = activity_subtree
+    cases["serialize_organization[page]"] = serialize_page
+    cases["list_buildings"] = buildings_listing
+    return cases
+
+
+def _search_case(filters: SearchFilters) -> Case:
+    async def run(session: AsyncSession) -> object:
+        return await search_organizations(session, filters, limit=PAGE_SIZE, offset=0)
+
+    return run
+
+
+async def run_case(
+    factory: async_sessionmaker[AsyncSession],
+    counter: StatementCounter,
+    case: Case,
+    *,
+    iterations: int,
+    warmup: int,
+) -> CaseResult:
+    for _ in range(warmup):
+        async with factory() as session:
+            await case(session)
+
+    durations: list[float] = []
+    statements_before = counter.count
+    for _ in range(iterations):
+        async with factory() as session:
+            started = time.perf_counter()
+            await case(session)
+            durations.append((time.perf_counter() - started) * 1000)
+
+    percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+    return CaseResult(
+        p50_ms=round(percentiles[49], 3),
+        p95_ms=round(percentiles[94], 3),
+        p99_ms=round(percentiles[98], 3),
+        queries_per_call=round((counter.count - statements_before) / iterations, 2),
+    )
+
+
+def find_regressions(
+    results: dict[str, CaseResult],
+    baseline: dict[str, dict],
+    *,
+    tolerance: float,
+    min_delta_ms: float,
+) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        slowdown_ms = result.p95_ms - expected["p95_ms"]
+        if result.p95_ms > expected["p95_ms"] * (1 + tolerance) and slowdown_ms > min_delta_ms:
+            regressions.append(f"{name}: p95 {result.p95_ms:.3f} ms > baseline {expected['p95_ms']:.3f} ms")
+        # Fractional counts come from periodic data version checks.
+        if result.queries_per_call >= expected["queries_per_call"] + 0.5:
+            regressions.append(
+                f"{name}: {result.queries_per_call} queries/call > baseline {expected['queries_per_call']}"
+            )
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.services", description=__doc__.splitlines()[0])
+    parser.add_argument("--organizations", type=int, default=20_000)
+    parser.add_argument("--buildings", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Where generated databases are kept.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", help="Run only cases whose name contains this substring.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative p95 slowdown before a case counts as a regression.",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=1.0,
+        help="Ignore p95 slowdowns smaller than this; sub-millisecond cases are mostly noise.",
+    )
+    return parser
+
+
+async def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    config = GeneratorConfig(args.organizations, args.buildings, args.seed)
+    engine = await prepare_database(config, args.data_dir)
+    counter = StatementCounter(engine)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    results: dict[str, CaseResult] = {}
+    print(f"{'case':<52} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+    for name, case in build_cases().items():
+        if args.only and args.only not in name:
+            continue
+        result = await run_case(factory, counter, case, iterations=args.iterations, warmup=args.warmup)
+        results[name] = result
+        print(
+            f"{name:<52} {result.p50_ms:>9.3f} {result.p95_ms:>9.3f} "
+            f"{result.p99_ms:>9.3f} {result.queries_per_call:>8}"
+        )
+    await engine.dispose()
+
+    dataset = asdict(config)
+    if args.save_baseline:
+        payload = {"dataset": dataset, "results": {name: asdict(result) for name, result in results.items()}}
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["dataset"] != dataset:
+        print(f"Baseline was recorded for {baseline['dataset']}, not {dataset}.", file=sys.stderr)
+        return 2
+    regressions = find_regressions(
+        results,
+        baseline["results"],
+        tolerance=args.tolerance,
+        min_delta_ms=args.min_delta_ms,
+    )
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -21,6 +21,16 @@ config.set_main_option("sqlalchemy.url", settings.database_url)
 
 target_metadata = Base.metadata
 
+# FTS5 virtual table behind organization name search on SQLite, together
+# with its shadow tables; it is managed by raw SQL in its migration.
+SQLITE_FTS_TABLE_PREFIX = "organizations_fts"
+
+
+def include_object(object_, name, type_, reflected, compare_to) -> bool:
+    if type_ == "table" and reflected and name.startswith(SQLITE_FTS_TABLE_PREFIX):
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -29,6 +39,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -36,7 +47,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
     with context.begin_transaction():
         context.run_migrations()
 
@@ -0,0 +1,66 @@
+"""add building location trig columns
+
+Revision ID: 3f9a6c21d8e4
+Revises: 78c04406574c
+Create Date: 2026-10-18 11:24:09.530117
+
+"""
+import math
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a6c21d8e4'
+down_revision: Union[str, Sequence[str], None] = '78c04406574c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIG_COLUMNS = ('lat_sin', 'lat_cos', 'lon_sin', 'lon_cos')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('buildings') as batch_op:
+        for name in TRIG_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Float(), nullable=False, server_default='0'))
+
+    # Backfilled in Python: SQLite builds are not guaranteed to ship sin/cos.
+    buildings = sa.table(
+        'buildings',
+        sa.column('id', sa.Integer()),
+        sa.column('latitude', sa.Float()),
+        sa.column('longitude', sa.Float()),
+        *(sa.column(name, sa.Float()) for name in TRIG_COLUMNS),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(buildings.c.id, buildings.c.latitude, buildings.c.longitude)).all()
+    if rows:
+        bind.execute(
+            buildings.update()
+            .where(buildings.c.id == sa.bindparam('building_id'))
+            .values({name: sa.bindparam(f'new_{name}') for name in TRIG_COLUMNS}),
+            [
+                {
+                    'building_id': building_id,
+                    'new_lat_sin': math.sin(math.radians(latitude)),
+                    'new_lat_cos': math.cos(math.radians(latitude)),
+                    'new_lon_sin': math.sin(math.radians(longitude)),
+                    'new_lon_cos': math.cos(math.radians(longitude)),
+                }
+                for building_id, latitude, longitude in rows
+            ],
+        )
+
+    with op.batch_alter_table('buildings') as batch_op:
+        for name in TRIG_COLUMNS:
+            batch_op.alter_column(name, server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('buildings') as batch_op:
+        for name in reversed(TRIG_COLUMNS):
+            batch_op.drop_column(name)
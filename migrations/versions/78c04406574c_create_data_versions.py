@@ -0,0 +1,33 @@
+"""create data versions
+
+Revision ID: 78c04406574c
+Revises: 61580e624291
+Create Date: 2026-10-18 10:02:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '78c04406574c'
+down_revision: Union[str, Sequence[str], None] = '61580e624291'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'data_versions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.String(length=32), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('data_versions')
@@ -0,0 +1,51 @@
+"""create activity closure
+
+Revision ID: a41d7e5c9b02
+Revises: 3f9a6c21d8e4
+Create Date: 2026-10-18 12:07:55.402861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d7e5c9b02'
+down_revision: Union[str, Sequence[str], None] = '3f9a6c21d8e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'activity_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['activities.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['activities.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+    )
+    op.create_index('ix_activity_closure_descendant_id', 'activity_closure', ['descendant_id'])
+    op.execute(
+        """
+        INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE branch (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM activities
+            UNION ALL
+            SELECT branch.ancestor_id, activities.id, branch.depth + 1
+            FROM branch
+            JOIN activities ON activities.parent_id = branch.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM branch
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activity_closure_descendant_id', table_name='activity_closure')
+    op.drop_table('activity_closure')
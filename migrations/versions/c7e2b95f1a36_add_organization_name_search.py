@@ -0,0 +1,77 @@
+"""add organization name search
+
+Revision ID: c7e2b95f1a36
+Revises: a41d7e5c9b02
+Create Date: 2026-10-18 13:41:12.870553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2b95f1a36'
+down_revision: Union[str, Sequence[str], None] = 'a41d7e5c9b02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_UPGRADE = (
+    """
+    CREATE VIRTUAL TABLE organizations_fts USING fts5(
+        name, content='organizations', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER organizations_fts_ai AFTER INSERT ON organizations BEGIN
+        INSERT INTO organizations_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER organizations_fts_ad AFTER DELETE ON organizations BEGIN
+        INSERT INTO organizations_fts (organizations_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER organizations_fts_au AFTER UPDATE OF name ON organizations BEGIN
+        INSERT INTO organizations_fts (organizations_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO organizations_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    "INSERT INTO organizations_fts (organizations_fts) VALUES ('rebuild')",
+)
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS organizations_fts_au",
+    "DROP TRIGGER IF EXISTS organizations_fts_ad",
+    "DROP TRIGGER IF EXISTS organizations_fts_ai",
+    "DROP TABLE IF EXISTS organizations_fts",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect_name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_organizations_name_trgm',
+            'organizations',
+            ['name'],
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect_name == 'postgresql':
+        op.drop_index('ix_organizations_name_trgm', table_name='organizations')
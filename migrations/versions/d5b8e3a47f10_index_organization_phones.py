@@ -0,0 +1,35 @@
+"""index organization phones by organization
+
+Revision ID: d5b8e3a47f10
+Revises: c7e2b95f1a36
+Create Date: 2026-10-18 14:21:07.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b8e3a47f10'
+down_revision: Union[str, Sequence[str], None] = 'c7e2b95f1a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f('ix_organization_phones_organization_id'),
+        'organization_phones',
+        ['organization_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f('ix_organization_phones_organization_id'),
+        table_name='organization_phones',
+    )
@@ -0,0 +1,107 @@
+"""add change tracking for the change feed
+
+Revision ID: e3a9c6d2f481
+Revises: d5b8e3a47f10
+Create Date: 2026-10-18 20:12:44.615302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c6d2f481'
+down_revision: Union[str, Sequence[str], None] = 'd5b8e3a47f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = ('activities', 'buildings', 'organizations')
+
+# A table rebuild drops the triggers that keep organizations_fts in sync
+# with organizations (see c7e2b95f1a36); they are restored after it.
+SQLITE_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER organizations_fts_ai AFTER INSERT ON organizations BEGIN
+        INSERT INTO organizations_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER organizations_fts_ad AFTER DELETE ON organizations BEGIN
+        INSERT INTO organizations_fts (organizations_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER organizations_fts_au AFTER UPDATE OF name ON organizations BEGIN
+        INSERT INTO organizations_fts (organizations_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO organizations_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    "INSERT INTO organizations_fts (organizations_fts) VALUES ('rebuild')",
+)
+
+
+def _change_columns() -> list[sa.Column]:
+    return [
+        sa.Column('revision', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_sqlite = op.get_bind().dialect.name == 'sqlite'
+    for table in TRACKED_TABLES:
+        if is_sqlite:
+            # SQLite only accepts a constant default in ADD COLUMN; rebuilding
+            # the table gives updated_at the same CURRENT_TIMESTAMP default as
+            # on PostgreSQL, and existing rows get the time of the migration.
+            with op.batch_alter_table(table, recreate='always') as batch_op:
+                for column in _change_columns():
+                    batch_op.add_column(column)
+        else:
+            for column in _change_columns():
+                op.add_column(table, column)
+        op.create_index(f'ix_{table}_revision', table, ['revision', 'id'])
+    if is_sqlite:
+        for statement in SQLITE_FTS_TRIGGERS:
+            op.execute(statement)
+
+    change_log_state = op.create_table(
+        'change_log_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('reset_revision', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(change_log_state, [{'id': 1, 'revision': 0, 'reset_revision': 0}])
+
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=32), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tombstones_revision', 'tombstones', ['revision', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tombstones_revision', table_name='tombstones')
+    op.drop_table('tombstones')
+    op.drop_table('change_log_state')
+    for table in reversed(TRACKED_TABLES):
+        op.drop_index(f'ix_{table}_revision', table_name=table)
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'revision')
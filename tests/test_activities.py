@@ -1,5 +1,10 @@
+import copy
+
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models import Activity
+from app.services.activities import fetch_activity_ancestors, fetch_activity_tree
 from tests.factories import SeedDataset
 
 
@@ -27,3 +32,76 @@ async def test_activity_tree_until_level_three(
     logistics = next(item for item in payload["items"] if item["id"] == seed_dataset.logistics_activity_id)
     assert len(logistics["children"]) == 1
     assert logistics["children"][0]["children"][0]["name"] == "Холодильные склады"
+
+
+async def test_activity_tree_reflects_new_activity(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get("/api/v1/activities/tree")
+    assert response.status_code == 200
+
+    db_session.add(Activity(name="Грузоперевозки", parent_id=seed_dataset.logistics_activity_id, level=2))
+    await db_session.commit()
+
+    response = await async_client.get("/api/v1/activities/tree", params={"max_level": 2})
+    assert response.status_code == 200
+    logistics = next(
+        item for item in response.json()["items"] if item["id"] == seed_dataset.logistics_activity_id
+    )
+    assert [child["name"] for child in logistics["children"]] == [
+        "Грузоперевозки",
+        "Складская логистика",
+    ]
+    assert logistics["children"][1]["children"] == []
+
+
+async def test_activity_subtree_and_ancestors(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get(f"/api/v1/activities/{seed_dataset.logistics_activity_id}/subtree")
+    assert response.status_code == 200
+    subtree = response.json()["item"]
+    assert subtree["id"] == seed_dataset.logistics_activity_id
+    storage = subtree["children"][0]
+    assert storage["name"] == "Складская логистика"
+    assert [child["name"] for child in storage["children"]] == ["Холодильные склады"]
+
+    response = await async_client.get(
+        f"/api/v1/activities/{seed_dataset.logistics_activity_id}/subtree",
+        params={"max_depth": 1},
+    )
+    assert response.json()["item"]["children"][0]["children"] == []
+
+    cold_storage_id = storage["children"][0]["id"]
+    response = await async_client.get(f"/api/v1/activities/{cold_storage_id}/ancestors")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [
+        seed_dataset.logistics_activity_id,
+        storage["id"],
+    ]
+
+    response = await async_client.get(f"/api/v1/activities/{seed_dataset.logistics_activity_id}/ancestors")
+    assert response.json()["items"] == []
+
+    response = await async_client.get("/api/v1/activities/999999/subtree")
+    assert response.status_code == 404
+
+
+async def test_activity_hierarchy_results_are_private_copies(
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+) -> None:
+    expected = copy.deepcopy(await fetch_activity_tree(db_session))
+    tree = await fetch_activity_tree(db_session)
+    for root in tree:
+        root["children"].clear()
+    tree.clear()
+    path = await fetch_activity_ancestors(db_session, seed_dataset.meat_activity_id)
+    path[0]["name"] = "changed"
+
+    assert await fetch_activity_tree(db_session) == expected
+    path = await fetch_activity_ancestors(db_session, seed_dataset.meat_activity_id)
+    assert path[0]["name"] == "Продукты питания"
@@ -0,0 +1,40 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.core.config import get_settings
+from app.db import session as db_session_module
+from app.services.versions import data_versions
+from benchmarks import services
+from tests.conftest import TEST_DB_URL
+
+
+@pytest.fixture
+def restore_database(configure_settings: None):
+    yield
+    os.environ["DATABASE_URL"] = TEST_DB_URL
+    get_settings.cache_clear()
+    db_session_module.reset_engine()
+    data_versions.invalidate()
+
+
+async def test_service_benchmarks_run_against_the_generated_database(
+    restore_database: None,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    exit_code = await services.main(
+        [
+            "--organizations", "60",
+            "--buildings", "12",
+            "--iterations", "2",
+            "--warmup", "1",
+            "--only", "search[geo=circle,query=0,activity=1]",
+            "--data-dir", str(tmp_path),
+            "--baseline", str(tmp_path / "baseline.json"),
+        ]
+    )
+    assert exit_code == 0
+    assert "search[geo=circle,query=0,activity=1]" in capsys.readouterr().out
+    assert db_session_module.engine.url.database == str(tmp_path / "directory-60-12-0.db")
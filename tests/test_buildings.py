@@ -1,5 +1,7 @@
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models import Building
 from tests.factories import SeedDataset
 
 
@@ -29,5 +31,68 @@ async def test_buildings_pagination(async_client: AsyncClient, seed_dataset: See
     )
     assert response.status_code == 200
     payload = response.json()
-    assert payload["total"] == 1
+    assert payload["total"] == 3
+    assert len(payload["items"]) == 1
     assert payload["items"][0]["address"] == "Тверская улица, 15"
+
+
+async def test_buildings_estimated_total(async_client: AsyncClient, seed_dataset: SeedDataset) -> None:
+    response = await async_client.get(
+        "/api/v1/buildings",
+        params={"limit": 1, "total": "estimate"},
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 3
+
+
+async def test_buildings_cursor_pagination(async_client: AsyncClient, seed_dataset: SeedDataset) -> None:
+    addresses = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await async_client.get("/api/v1/buildings", params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        addresses.extend(item["address"] for item in payload["items"])
+        cursor = payload["next_cursor"]
+        if cursor is None:
+            break
+
+    assert addresses == [
+        "Ленинский проспект, 10",
+        "Тверская улица, 15",
+        "Невский проспект, 25",
+    ]
+
+
+async def test_buildings_rejects_invalid_cursor(async_client: AsyncClient) -> None:
+    response = await async_client.get("/api/v1/buildings", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 422
+
+    response = await async_client.get("/api/v1/buildings", params={"cursor": "WzFd", "offset": 1})
+    assert response.status_code == 422
+
+
+async def test_buildings_conditional_get(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get("/api/v1/buildings")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await async_client.get("/api/v1/buildings", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    db_session.add(Building(city="Казань", address="Баумана, 1", latitude=55.79, longitude=49.11))
+    await db_session.commit()
+
+    response = await async_client.get("/api/v1/buildings", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["total"] == 4
@@ -0,0 +1,92 @@
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.entities import Activity, Building, Organization
+from app.seeds.loader import load_records
+from tests.factories import SeedDataset
+
+
+async def _read_feed(async_client: AsyncClient, since: str | None, *, limit: int) -> tuple[list[dict], str | None]:
+    items: list[dict] = []
+    while True:
+        params = {"limit": limit} if since is None else {"limit": limit, "since": since}
+        response = await async_client.get("/api/v1/changes", params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        items.extend(payload["items"])
+        since = payload["next"]
+        if not payload["has_more"]:
+            return items, since
+
+
+async def test_change_feed_pages_through_upserts_and_tombstones(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+) -> None:
+    items, token = await _read_feed(async_client, None, limit=3)
+    keys = [(item["type"], item["id"]) for item in items]
+    assert len(keys) == len(set(keys))
+    assert ("organization", seed_dataset.meat_org_id) in keys
+    assert ("building", seed_dataset.primary_building_id) in keys
+    # Parents come before the rows that reference them.
+    first_organization = next(i for i, item in enumerate(items) if item["type"] == "organization")
+    assert all(item["type"] != "activity" for item in items[first_organization:])
+    revisions = [item["revision"] for item in items]
+    assert revisions == sorted(revisions)
+
+    meat = await db_session.get(Organization, seed_dataset.meat_org_id)
+    meat.name = "Мясокомбинат «Обновлённый»"
+    auto = await db_session.get(Organization, seed_dataset.auto_org_id)
+    await db_session.delete(auto)
+    await db_session.commit()
+
+    changes, _ = await _read_feed(async_client, token, limit=100)
+    assert [(item["type"], item["op"], item["id"]) for item in changes] == [
+        ("organization", "upsert", seed_dataset.meat_org_id),
+        ("organization", "delete", seed_dataset.auto_org_id),
+    ]
+    assert changes[0]["data"]["name"] == "Мясокомбинат «Обновлённый»"
+    assert changes[0]["revision"] > revisions[-1]
+
+
+async def test_change_feed_re_emits_organizations_of_updated_buildings_and_activities(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+) -> None:
+    _, token = await _read_feed(async_client, None, limit=100)
+
+    building = await db_session.get(Building, seed_dataset.distant_building_id)
+    building.address = "Новая улица, 7"
+    await db_session.commit()
+
+    changes, token = await _read_feed(async_client, token, limit=100)
+    assert [(item["type"], item["id"]) for item in changes] == [
+        ("building", seed_dataset.distant_building_id),
+        ("organization", seed_dataset.northern_org_id),
+    ]
+    assert changes[1]["data"]["building"]["address"] == "Новая улица, 7"
+
+    activity = await db_session.get(Activity, seed_dataset.dairy_activity_id)
+    activity.name = "Молочная продукция"
+    await db_session.commit()
+
+    changes, _ = await _read_feed(async_client, token, limit=100)
+    assert changes[0] == {**changes[0], "type": "activity", "id": seed_dataset.dairy_activity_id}
+    dairy = next(item for item in changes if item["id"] == seed_dataset.dairy_org_id and item["type"] == "organization")
+    assert "Молочная продукция" in [activity["name"] for activity in dairy["data"]["activities"]]
+
+async def test_change_feed_rejects_tokens_from_before_a_reload(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+) -> None:
+    _, token = await _read_feed(async_client, None, limit=100)
+    await load_records(db_session, [], [], truncate=True)
+
+    response = await async_client.get("/api/v1/changes", params={"since": token})
+    assert response.status_code == 410
+
+    response = await async_client.get("/api/v1/changes", params={"since": "not-a-token"})
+    assert response.status_code == 422
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import session as db_session_module
+from app.db.base import Base
+from app.db.replicas import ReplicaSet
+from tests.conftest import TEST_DB_URL
+from tests.factories import SeedDataset
+
+
+async def test_reads_fail_over_from_unreachable_replica(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    unreachable = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    healthy = create_async_engine(TEST_DB_URL)
+    replicas = ReplicaSet([unreachable, healthy], cooldown_seconds=60)
+    monkeypatch.setattr(db_session_module, "replicas", replicas)
+
+    for _ in range(3):
+        response = await async_client.get(f"/api/v1/organizations/{seed_dataset.meat_org_id}")
+        assert response.status_code == 200
+
+    assert not replicas.is_healthy(unreachable)
+    assert replicas.is_healthy(healthy)
+    assert list(replicas.candidates()) == [healthy]
+    assert healthy.pool.checkedin() > 0
+    await replicas.dispose()
+
+
+async def test_reads_fail_over_on_socket_errors_from_the_driver(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # asyncpg reports an unreachable host with a bare OSError, not a DBAPI error.
+    async def refuse_connection():
+        raise ConnectionRefusedError(111, "Connection refused")
+
+    refused = create_async_engine("sqlite+aiosqlite://", async_creator=refuse_connection)
+    replicas = ReplicaSet([refused], cooldown_seconds=60)
+    monkeypatch.setattr(db_session_module, "replicas", replicas)
+
+    response = await async_client.get(f"/api/v1/organizations/{seed_dataset.meat_org_id}")
+    assert response.status_code == 200
+    assert not replicas.is_healthy(refused)
+    await replicas.dispose()
+
+async def test_lagging_replica_does_not_pin_stale_cache_entries(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    # An empty replica stands in for one that has not replayed the seed yet.
+    lagging = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with lagging.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(db_session_module, "replicas", ReplicaSet([lagging], cooldown_seconds=60))
+
+    stale = await async_client.get("/api/v1/buildings")
+    assert stale.status_code == 200
+    assert stale.json()["total"] == 0
+
+    monkeypatch.setattr(db_session_module, "replicas", ReplicaSet([], cooldown_seconds=60))
+    fresh = await async_client.get(
+        "/api/v1/buildings", headers={"If-None-Match": stale.headers["etag"]}
+    )
+    assert fresh.status_code == 200
+    assert fresh.json()["total"] == 3
+    assert fresh.headers["etag"] != stale.headers["etag"]
+    await lagging.dispose()
@@ -0,0 +1,74 @@
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import get_settings
+from tests.factories import SeedDataset
+
+
+async def test_pool_health_reports_checkout_stats(
+    async_client: AsyncClient,
+    clean_database: None,
+) -> None:
+    response = await async_client.get("/api/v1/organizations/search", params={"query": "Рога"})
+    assert response.status_code == 200
+
+    response = await async_client.get("/api/v1/health/pool")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["pool"] == "InstrumentedAsyncPool"
+    assert payload["capacity"] == payload["size"] + 10
+    assert payload["checkouts"] >= 1
+    assert payload["timeouts"] == 0
+    assert 0 <= payload["saturation"] <= 1
+
+
+async def test_metrics_expose_route_templates_and_queries(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get(f"/api/v1/organizations/{seed_dataset.meat_org_id}")
+    assert response.status_code == 200
+
+    response = await async_client.get("/metrics", headers={"X-API-Key": ""})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+
+    route = 'method="GET",route="/api/v1/organizations/{organization_id}"'
+    assert any(line.startswith(f'http_requests_total{{{route},status="200"}} ') for line in lines)
+    assert any(line.startswith(f'http_request_duration_seconds_bucket{{{route},le="+Inf"}} ') for line in lines)
+    assert not any(f"/organizations/{seed_dataset.meat_org_id}" in line for line in lines)
+    assert any(line.startswith('db_queries_total{operation="SELECT"} ') for line in lines)
+    assert any(line.startswith('db_pool_checked_out{engine="primary"} ') for line in lines)
+
+
+async def test_request_profiling_reports_server_timing_and_slow_requests(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "request_profiling_enabled", True)
+    monkeypatch.setattr(settings, "slow_request_threshold_ms", 0.0)
+
+    with caplog.at_level(logging.WARNING, logger="app.slow_requests"):
+        response = await async_client.get(f"/api/v1/organizations/{seed_dataset.meat_org_id}")
+    assert response.status_code == 200
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert "db-slowest;dur=" in timing
+
+    record = caplog.records[-1].slow_request
+    assert record["route"] == "/api/v1/organizations/{organization_id}"
+    assert record["db_queries"] >= 1
+    assert record["statements"][0]["sql"].lstrip().upper().startswith("SELECT")
+    assert seed_dataset.meat_org_id in record["statements"][-1]["parameters"]
+
+
+async def test_request_profiling_is_off_by_default(async_client: AsyncClient, clean_database: None) -> None:
+    response = await async_client.get("/api/v1/health")
+    assert "server-timing" not in response.headers
@@ -1,6 +1,13 @@
+import json
+
 from httpx import AsyncClient
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from app.core.config import get_settings
+from app.models import Activity, Organization
+from app.services.organizations import SearchFilters, count_search_organizations, search_organizations
 from tests.factories import SeedDataset
 
 
@@ -73,6 +80,64 @@ async def test_search_organizations_within_radius(
     assert "ООО АвтоМир" in names
 
 
+async def test_radius_search_fills_page_with_exact_matches(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    # Тверская, 15 попадает в описанный квадрат, но лежит дальше 1.8 км.
+    response = await async_client.get(
+        "/api/v1/organizations/search",
+        params={
+            "lat": 55.751244,
+            "lon": 37.618423,
+            "radius_km": 1.8,
+            "limit": 2,
+        },
+    )
+    assert response.status_code == 200
+    payload = response.json()
+
+    names = [item["name"] for item in payload["items"]]
+    assert names == ["ООО АвтоМир", "ООО Рога и Копыта"]
+    assert payload["total"] == 2
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        SearchFilters(lat=55.751244, lon=37.618423, radius_km=1.8),
+        SearchFilters(lat=55.751, lon=37.618, radius_km=3, min_lat=55.70, max_lat=55.80, min_lon=37.50, max_lon=37.70),
+        SearchFilters(min_lat=55.70, max_lat=55.80, min_lon=37.50, max_lon=37.70),
+    ],
+)
+async def test_large_geo_matches_filter_by_coordinates_in_sql(
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+    monkeypatch: pytest.MonkeyPatch,
+    filters: SearchFilters,
+) -> None:
+    inline = await search_organizations(db_session, filters, limit=50, offset=0)
+    monkeypatch.setattr(get_settings(), "spatial_inline_ids_max", 0)
+    in_sql = await search_organizations(db_session, filters, limit=50, offset=0)
+
+    assert inline.items
+    assert [card.id for card in in_sql.items] == [card.id for card in inline.items]
+    assert await count_search_organizations(db_session, filters) == len(inline.items)
+
+async def test_search_total_counts_all_matches(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get(
+        "/api/v1/organizations/search",
+        params={"activity_id": seed_dataset.food_activity_id, "limit": 1},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert len(payload["items"]) == 1
+    assert payload["total"] == 2
+
+
 async def test_search_organizations_in_bbox(
     async_client: AsyncClient,
     seed_dataset: SeedDataset,
@@ -108,6 +173,73 @@ async def test_get_organization_detail(
     assert payload["activities"][0]["name"] == "Мясная продукция"
 
 
+async def test_get_organizations_batch(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get(
+        "/api/v1/organizations/batch",
+        params={"ids": f"{seed_dataset.dairy_org_id},999999,{seed_dataset.meat_org_id}"},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert [item["id"] for item in payload["items"]] == [
+        seed_dataset.dairy_org_id,
+        seed_dataset.meat_org_id,
+    ]
+    assert payload["missing"] == [999999]
+    assert payload["items"][1]["phones"] == ["+7-495-111-2233", "+7-495-111-4455"]
+
+    response = await async_client.post(
+        "/api/v1/organizations/batch",
+        json={"ids": [seed_dataset.auto_org_id, seed_dataset.auto_org_id]},
+    )
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()["items"]] == ["ООО АвтоМир"]
+
+
+async def test_organizations_batch_is_capped(async_client: AsyncClient) -> None:
+    response = await async_client.post(
+        "/api/v1/organizations/batch",
+        json={"ids": list(range(1, 1000))},
+    )
+    assert response.status_code == 422
+
+
+async def test_export_organizations_as_ndjson(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get("/api/v1/organizations/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["id"] for record in records] == [
+        seed_dataset.meat_org_id,
+        seed_dataset.auto_org_id,
+        seed_dataset.dairy_org_id,
+        seed_dataset.northern_org_id,
+    ]
+    assert records[0]["phones"] == ["+7-495-111-2233", "+7-495-111-4455"]
+
+    response = await async_client.get(
+        "/api/v1/organizations/export",
+        params={"activity_id": seed_dataset.food_activity_id},
+    )
+    assert response.status_code == 200
+    names = [json.loads(line)["name"] for line in response.text.splitlines()]
+    assert names == ["ООО Рога и Копыта", "ООО Молочная ферма"]
+
+
+async def test_export_rejects_unknown_activity(async_client: AsyncClient) -> None:
+    response = await async_client.get(
+        "/api/v1/organizations/export",
+        params={"activity_id": 999999},
+    )
+    assert response.status_code == 404
+
+
 async def test_get_organization_detail_not_found(
     async_client: AsyncClient,
 ) -> None:
@@ -128,6 +260,29 @@ async def test_search_organizations_by_name(
     assert payload["items"][0]["name"] == "ООО Рога и Копыта"
 
 
+async def test_name_search_is_case_insensitive_and_ranked(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get(
+        "/api/v1/organizations/search",
+        params={"query": "автомир"},
+    )
+    assert response.status_code == 200
+    names = [item["name"] for item in response.json()["items"]]
+    assert names == ["ООО АвтоМир"]
+
+    response = await async_client.get(
+        "/api/v1/organizations/search",
+        params={"query": "ооо"},
+    )
+    assert response.status_code == 200
+    names = [item["name"] for item in response.json()["items"]]
+    # Короткие названия содержат запрос большей долей и идут первыми.
+    assert names[0] == "ООО АвтоМир"
+    assert len(names) == 4
+
+
 async def test_global_activity_search_returns_descendants(
     async_client: AsyncClient,
     seed_dataset: SeedDataset,
@@ -158,11 +313,40 @@ async def test_list_organizations_supports_pagination(
     )
     assert response.status_code == 200
     payload = response.json()
-    assert payload["total"] == 1
+    assert payload["total"] == 2
+    assert len(payload["items"]) == 1
     assert payload["items"][0]["name"] == "ООО Рога и Копыта"
     assert payload["offset"] == 1
 
 
+async def test_search_cursor_pagination_follows_relevance_order(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get(
+        "/api/v1/organizations/search",
+        params={"query": "ооо"},
+    )
+    assert response.status_code == 200
+    expected = [item["name"] for item in response.json()["items"]]
+
+    names = []
+    cursor = None
+    while True:
+        params = {"query": "ооо", "limit": 1}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await async_client.get("/api/v1/organizations/search", params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        names.extend(item["name"] for item in payload["items"])
+        cursor = payload["next_cursor"]
+        if cursor is None:
+            break
+
+    assert names == expected
+
+
 async def test_geo_search_requires_complete_circle_parameters(
     async_client: AsyncClient,
 ) -> None:
@@ -181,3 +365,92 @@ async def test_geo_search_requires_complete_bbox_parameters(
         params={"min_lat": 55.7, "max_lat": 55.8, "min_lon": 37.5},
     )
     assert response.status_code == 422
+
+
+async def test_nearest_organizations_sorted_by_distance(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    response = await async_client.get(
+        "/api/v1/organizations/nearest",
+        params={"lat": 55.7651, "lon": 37.6350, "k": 3},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+
+    assert payload["k"] == 3
+    names = [item["name"] for item in payload["items"]]
+    assert names == ["ООО Молочная ферма", "ООО АвтоМир", "ООО Рога и Копыта"]
+
+    distances = [item["distance_km"] for item in payload["items"]]
+    assert distances[0] < 0.01
+    assert distances[1] == pytest.approx(1.86, abs=0.01)
+    assert distances[1] == distances[2]
+    assert payload["items"][0]["building"]["id"] == seed_dataset.secondary_building_id
+
+
+async def test_activity_search_includes_new_subactivity(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+) -> None:
+    sausages = Activity(name="Колбасы", parent_id=seed_dataset.meat_activity_id, level=3)
+    organization = await db_session.get(
+        Organization,
+        seed_dataset.northern_org_id,
+        options=[selectinload(Organization.activities)],
+    )
+    organization.activities.append(sausages)
+    await db_session.commit()
+
+    response = await async_client.get(
+        "/api/v1/organizations/search",
+        params={"activity_id": seed_dataset.food_activity_id},
+    )
+    assert response.status_code == 200
+    names = [item["name"] for item in response.json()["items"]]
+    assert "ООО Северный Ветер" in names
+
+
+async def test_organization_card_without_phones_or_activities(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+) -> None:
+    organization = Organization(name="ООО Пустая карточка", building_id=seed_dataset.distant_building_id)
+    db_session.add(organization)
+    await db_session.commit()
+
+    response = await async_client.get(f"/api/v1/organizations/{organization.id}")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["phones"] == []
+    assert payload["activities"] == []
+    assert payload["building"]["city"] == "Санкт-Петербург"
+
+
+async def test_wildcard_if_none_match_needs_an_existing_resource(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    headers = {"If-None-Match": "*"}
+    response = await async_client.get("/api/v1/organizations/999999", headers=headers)
+    assert response.status_code == 404
+
+    response = await async_client.get(f"/api/v1/organizations/{seed_dataset.meat_org_id}", headers=headers)
+    assert response.status_code == 304
+
+
+async def test_etag_ignores_parameter_order_but_not_value_order(
+    async_client: AsyncClient,
+    seed_dataset: SeedDataset,
+) -> None:
+    first = await async_client.get("/api/v1/organizations/search?query=Рога&limit=5")
+    second = await async_client.get("/api/v1/organizations/search?limit=5&query=Рога")
+    assert first.headers["etag"] == second.headers["etag"]
+
+    dairy, meat = seed_dataset.dairy_org_id, seed_dataset.meat_org_id
+    forward = await async_client.get(f"/api/v1/organizations/batch?ids={dairy}&ids={meat}")
+    backward = await async_client.get(f"/api/v1/organizations/batch?ids={meat}&ids={dairy}")
+    assert forward.headers["etag"] != backward.headers["etag"]
+    assert [item["id"] for item in backward.json()["items"]] == [meat, dairy]
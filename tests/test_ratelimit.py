@@ -0,0 +1,67 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import ApiKeyQuota, get_settings
+
+
+@pytest.fixture
+def partner_key(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    # Buckets outlive a test, so each test gets its own key.
+    key = f"partner-key-{request.node.name}"
+    settings = get_settings()
+    quota = ApiKeyQuota(name="partner", rate=0.5, burst=6)
+    monkeypatch.setattr(settings, "api_keys", {key: quota})
+    monkeypatch.setattr(settings, "rate_limit_search_cost", 5.0)
+    return key
+
+
+async def test_additional_keys_are_accepted(async_client: AsyncClient, clean_database: None, partner_key: str) -> None:
+    response = await async_client.get("/api/v1/buildings", headers={"X-API-Key": partner_key})
+    assert response.status_code == 200
+    assert response.headers["x-ratelimit-limit"] == "6"
+    assert response.headers["x-ratelimit-remaining"] == "5"
+
+    response = await async_client.get("/api/v1/buildings", headers={"X-API-Key": "unknown"})
+    assert response.status_code == 403
+    assert "x-ratelimit-limit" not in response.headers
+
+
+async def test_searches_cost_more_and_exhaust_the_bucket(
+    async_client: AsyncClient,
+    clean_database: None,
+    partner_key: str,
+) -> None:
+    headers = {"X-API-Key": partner_key}
+    response = await async_client.get("/api/v1/organizations/search", params={"query": "Рога"}, headers=headers)
+    assert response.status_code == 200
+    assert int(response.headers["x-ratelimit-remaining"]) <= 1
+
+    response = await async_client.get("/api/v1/organizations/search", params={"query": "Рога"}, headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.json()["detail"] == "Превышен лимит запросов для API-ключа"
+
+    # Health checks are never limited, and keys without a quota are unlimited.
+    assert (await async_client.get("/api/v1/health", headers=headers)).status_code == 200
+    response = await async_client.get("/api/v1/organizations/search", params={"query": "Рога"})
+    assert response.status_code == 200
+    assert "x-ratelimit-limit" not in response.headers
+
+
+async def test_keys_sharing_a_name_keep_separate_buckets(
+    async_client: AsyncClient,
+    clean_database: None,
+    partner_key: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    other_key = f"{partner_key}-other"
+    monkeypatch.setattr(settings, "api_keys", {**settings.api_keys, other_key: settings.api_keys[partner_key]})
+
+    params = {"query": "Рога"}
+    response = await async_client.get("/api/v1/organizations/search", params=params, headers={"X-API-Key": partner_key})
+    assert response.status_code == 200
+
+    response = await async_client.get("/api/v1/organizations/search", params=params, headers={"X-API-Key": other_key})
+    assert response.status_code == 200
+    assert response.headers["x-ratelimit-remaining"] == "1"
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.seeds.generator import GeneratorConfig, build_activity_tree, iter_organizations
+from app.seeds.loader import load_directory
+from tests.factories import SeedDataset
+
+
+async def test_load_directory_round_trips_export(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    seed_dataset: SeedDataset,
+    tmp_path: Path,
+) -> None:
+    response = await async_client.get("/api/v1/organizations/export")
+    assert response.status_code == 200
+    exported = [json.loads(line) for line in response.text.splitlines()]
+
+    dump = tmp_path / "orgs.ndjson"
+    activity = {"type": "activity", "id": 10, "name": "Продукты питания", "parent_id": None, "level": 1}
+    dump.write_text(
+        "\n".join(json.dumps(line, ensure_ascii=False) for line in [activity, *exported]),
+        encoding="utf-8",
+    )
+
+    stats = await load_directory(db_session, dump, truncate=True, batch_size=2)
+    assert stats.organizations == 4
+    assert stats.buildings == 3
+    assert stats.phones == 5
+
+    response = await async_client.get("/api/v1/organizations/export")
+    assert [json.loads(line) for line in response.text.splitlines()] == exported
+
+    response = await async_client.get(
+        "/api/v1/organizations/search",
+        params={"activity_id": seed_dataset.food_activity_id, "query": "ферма"},
+    )
+    assert [item["name"] for item in response.json()["items"]] == ["ООО Молочная ферма"]
+
+
+def test_generator_is_deterministic_across_workers() -> None:
+    config = GeneratorConfig(organizations=250, buildings=40, seed=7)
+    serial = list(iter_organizations(config, workers=1, chunk_size=100))
+    parallel = list(iter_organizations(config, workers=2, chunk_size=100))
+
+    assert serial == parallel
+    assert [record["id"] for record in serial] == list(range(1, 251))
+    assert len({record["name"] for record in serial}) == 250
+    assert all(1 <= record["building"]["id"] <= 40 for record in serial)
+
+    levels = {row["level"] for row in build_activity_tree()}
+    assert levels == {1, 2, 3}
+    assert serial != list(iter_organizations(GeneratorConfig(250, 40, seed=8), chunk_size=100))
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_result() -> None:
+    flight: SingleFlight[int] = SingleFlight("test")
+    calls = 0
+    release = asyncio.Event()
+
+    async def call() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    waiters = [asyncio.create_task(flight.run("key", call, wait_seconds=5)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [42] * 10
+    assert calls == 1
+
+    # Nothing is cached once the call has finished.
+    assert await flight.run("key", call, wait_seconds=5) == 42
+    assert calls == 2
+
+
+async def test_errors_reach_every_waiter() -> None:
+    flight: SingleFlight[int] = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def call() -> int:
+        await release.wait()
+        raise LookupError("boom")
+
+    waiters = [asyncio.create_task(flight.run("key", call, wait_seconds=5)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, LookupError) for result in results)
+
+
+async def test_waiters_fall_back_after_timeout_or_leader_cancellation() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def slow() -> str:
+        await release.wait()
+        return "leader"
+
+    async def fast() -> str:
+        return "own"
+
+    leader = asyncio.create_task(flight.run("key", slow, wait_seconds=5))
+    await asyncio.sleep(0)
+    assert await flight.run("key", fast, wait_seconds=0.01) == "own"
+
+    follower = asyncio.create_task(flight.run("key", fast, wait_seconds=5))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await follower == "own"